@@ -0,0 +1,278 @@
+"""Benchmarks for the TOPSIS scoring pipeline.
+
+Synthetic decision matrices over a grid of rows x criteria are pushed
+through every pipeline stage, each timed separately (best and median of
+``--repeat`` runs) with its tracemalloc peak measured in one extra run.
+Only the standard library is needed on top of the package itself.
+
+    python benchmarks/bench_pipeline.py run --rows 1e2,1e4,1e6 --criteria 2,20,200 \\
+        --output new.json
+    python benchmarks/bench_pipeline.py compare old.json new.json
+    python benchmarks/bench_pipeline.py compare /path/to/old-venv/bin/python python3
+
+``compare`` takes saved results or Python interpreters (each with its own
+installed version of the package, run with the same grid) and exits with
+status 1 when a stage got slower than ``--threshold``. Stages a version
+does not have (the engine stages on releases before the NumPy engine) are
+left out of its results, and only stages both sides ran are compared.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+PACKAGE = "topsis_samiksha_102317096"
+
+DEFAULT_ROWS = "1e2,1e4,1e6"
+DEFAULT_CRITERIA = "2,20,200"
+
+
+def _sizes(text):
+    return [int(float(value)) for value in text.split(",") if value.strip()]
+
+
+def measure_import(repeat=5):
+    """Fresh-interpreter import time of the CLI module, in milliseconds.
+
+    ``python -c`` puts the working directory first on ``sys.path``, so the
+    probe runs in an empty directory: from the package root it would
+    otherwise time the working tree instead of the installed version.
+    """
+    code = (
+        "import sys, time; start = time.perf_counter(); "
+        f"import {PACKAGE}.topsis; "
+        "print(time.perf_counter() - start, 'pandas' in sys.modules)"
+    )
+    timings, pandas_loaded = [], False
+    with tempfile.TemporaryDirectory() as empty:
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                    text=True, check=True, cwd=empty).stdout.split()
+            timings.append(float(output[0]) * 1000)
+            pandas_loaded = output[1] == "True"
+    return {"best_ms": min(timings), "median_ms": statistics.median(timings),
+            "pandas_loaded": pandas_loaded}
+
+
+def _time(stage, repeat):
+    timings = []
+    for _ in range(repeat):
+        arguments = stage["setup"]()
+        start = time.perf_counter()
+        stage["run"](*arguments)
+        timings.append(time.perf_counter() - start)
+
+    arguments = stage["setup"]()
+    tracemalloc.start()
+    stage["run"](*arguments)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak
+
+
+def build_stages(rows, criteria, directory, with_csv, seed=0):
+    """Stage name -> {"setup": () -> args, "run": callable}, for this version."""
+    import numpy as np
+    import pandas as pd
+    from topsis_samiksha_102317096 import topsis
+
+    rng = np.random.default_rng(seed)
+    matrix = rng.uniform(1.0, 100.0, size=(rows, criteria))
+    weights = rng.uniform(0.5, 2.0, size=criteria)
+    impacts = np.where(rng.random(criteria) < 0.5, "+", "-")
+    dataframe = pd.DataFrame(matrix, columns=[f"C{j + 1}" for j in range(criteria)])
+    dataframe.insert(0, "Alternative", [f"A{i}" for i in range(rows)])
+    frame_matrix = dataframe.iloc[:, 1:]
+
+    stages = {}
+    input_file = os.path.join(directory, f"input-{rows}x{criteria}.csv")
+    output_file = os.path.join(directory, "output.csv")
+    if with_csv:
+        dataframe.to_csv(input_file, index=False)
+        stages["read_validate"] = {
+            "setup": lambda: (input_file, list(weights), list(impacts)),
+            "run": topsis.validate_input,
+        }
+
+    stages["apply_topsis"] = {
+        "setup": lambda: (dataframe, frame_matrix, weights, impacts),
+        "run": topsis.apply_topsis,
+    }
+
+    try:
+        from topsis_samiksha_102317096 import engine
+    except ImportError:
+        engine = None
+    # An editable install can resolve a module missing from an older copy
+    # earlier on sys.path; only use the engine shipped with this version
+    if engine is not None and os.path.dirname(engine.__file__) == os.path.dirname(topsis.__file__):
+        weighted = engine.weighted_normalized(matrix, weights)
+        pis, nis = engine.ideal_solutions(weighted, impacts)
+        distances = engine.separation_measures(weighted, pis, nis)
+        scores = engine.relative_closeness(*(d.copy() for d in distances))
+        stages.update({
+            "normalize": {"setup": lambda: (matrix, weights), "run": engine.weighted_normalized},
+            "ideal": {"setup": lambda: (weighted, impacts), "run": engine.ideal_solutions},
+            "distance": {"setup": lambda: (weighted, pis, nis), "run": engine.separation_measures},
+            "closeness": {"setup": lambda: tuple(d.copy() for d in distances),
+                          "run": engine.relative_closeness},
+            "rank": {"setup": lambda: (scores,), "run": engine.dense_rank},
+        })
+
+    if with_csv:
+        result = topsis.apply_topsis(dataframe, frame_matrix, weights, impacts)
+        stages["to_csv"] = {
+            "setup": lambda: (output_file,),
+            "run": lambda path: result.to_csv(path, index=False),
+        }
+    return stages
+
+
+def run(args):
+    import numpy as np
+    import pandas as pd
+    import topsis_samiksha_102317096 as package
+
+    try:
+        from importlib.metadata import version
+        installed = version("Topsis-Samiksha-102317096")
+    except Exception:
+        installed = getattr(package, "__version__", "unknown")
+
+    report = {
+        "meta": {
+            "package": installed,
+            "location": os.path.dirname(package.__file__),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+        },
+        "import": measure_import(),
+        "results": [],
+    }
+    log = sys.stderr if args.quiet else sys.stdout
+    print(f"import {PACKAGE}.topsis: {report['import']['best_ms']:.1f} ms "
+          f"(pandas loaded: {report['import']['pandas_loaded']})", file=log)
+    print(f"{'rows':>10} {'crit':>5} {'stage':<14} {'best s':>10} {'median s':>10} {'peak MiB':>9}",
+          file=log)
+
+    with tempfile.TemporaryDirectory(prefix="topsis-bench-") as directory:
+        for rows in _sizes(args.rows):
+            for criteria in _sizes(args.criteria):
+                cells = rows * criteria
+                if cells > args.max_cells:
+                    print(f"{rows:>10} {criteria:>5} skipped (> --max-cells)", file=log)
+                    continue
+                stages = build_stages(rows, criteria, directory, cells <= args.max_csv_cells)
+                for name, stage in stages.items():
+                    best, median, peak = _time(stage, args.repeat)
+                    report["results"].append({
+                        "rows": rows, "criteria": criteria, "stage": name,
+                        "best_s": best, "median_s": median, "peak_bytes": peak,
+                    })
+                    print(f"{rows:>10} {criteria:>5} {name:<14} {best:>10.5f} {median:>10.5f} "
+                          f"{peak / 2 ** 20:>9.1f}", file=log)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    if args.quiet:
+        json.dump(report, sys.stdout)
+
+    if args.import_budget is not None and report["import"]["best_ms"] > args.import_budget:
+        print(f"Error: import took {report['import']['best_ms']:.1f} ms, "
+              f"budget is {args.import_budget:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _load(source, args):
+    """Saved results (.json) or a fresh run under another interpreter."""
+    if source.endswith(".json"):
+        with open(source) as handle:
+            return json.load(handle)
+
+    command = [source, os.path.abspath(__file__), "run", "--quiet",
+               "--rows", args.rows, "--criteria", args.criteria, "--repeat", str(args.repeat),
+               "--max-cells", str(args.max_cells), "--max-csv-cells", str(args.max_csv_cells)]
+    return json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+
+
+def compare(args):
+    baseline, candidate = _load(args.baseline, args), _load(args.candidate, args)
+    print(f"baseline:  {baseline['meta']['package']} (Python {baseline['meta']['python']})")
+    print(f"candidate: {candidate['meta']['package']} (Python {candidate['meta']['python']})")
+    print(f"import: {baseline['import']['best_ms']:.1f} ms -> {candidate['import']['best_ms']:.1f} ms")
+
+    before = {(r["rows"], r["criteria"], r["stage"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"{'rows':>10} {'crit':>5} {'stage':<14} {'before s':>10} {'after s':>10} {'ratio':>7} "
+          f"{'peak MiB':>17}")
+    for result in candidate["results"]:
+        old = before.get((result["rows"], result["criteria"], result["stage"]))
+        if old is None:
+            continue
+        ratio = result["best_s"] / old["best_s"] if old["best_s"] else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            regressions += 1
+            flag = "  SLOWER"
+        elif ratio < 1 / args.threshold:
+            flag = "  faster"
+        peaks = f"{old['peak_bytes'] / 2 ** 20:.1f} -> {result['peak_bytes'] / 2 ** 20:.1f}"
+        print(f"{result['rows']:>10} {result['criteria']:>5} {result['stage']:<14} "
+              f"{old['best_s']:>10.5f} {result['best_s']:>10.5f} {ratio:>7.2f} {peaks:>17}{flag}")
+
+    print(f"{regressions} stage(s) slower than x{args.threshold}")
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the TOPSIS pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_grid(command):
+        command.add_argument("--rows", default=DEFAULT_ROWS,
+                             help=f"comma-separated row counts (default: {DEFAULT_ROWS})")
+        command.add_argument("--criteria", default=DEFAULT_CRITERIA,
+                             help=f"comma-separated criteria counts (default: {DEFAULT_CRITERIA})")
+        command.add_argument("--repeat", type=int, default=3, help="timed runs per stage (default: 3)")
+        command.add_argument("--max-cells", type=float, default=1e8,
+                             help="skip shapes with more cells than this (default: 1e8)")
+        command.add_argument("--max-csv-cells", type=float, default=2e7,
+                             help="skip the CSV read/write stages above this (default: 2e7)")
+
+    run_command = commands.add_parser("run", help="run the grid and report timings")
+    add_grid(run_command)
+    run_command.add_argument("--output", help="also write the results to this JSON file")
+    run_command.add_argument("--import-budget", type=float, metavar="MS",
+                             help="exit with status 1 if importing the CLI takes longer")
+    run_command.add_argument("--quiet", action="store_true",
+                             help="print the JSON report to stdout and the table to stderr")
+
+    compare_command = commands.add_parser("compare", help="compare two versions")
+    compare_command.add_argument("baseline", help="results .json file or Python interpreter")
+    compare_command.add_argument("candidate", help="results .json file or Python interpreter")
+    compare_command.add_argument("--threshold", type=float, default=1.10,
+                                 help="ratio that counts as a regression (default: 1.10)")
+    add_grid(compare_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,9 +25,14 @@ setup(
         "pandas>=1.0.0",
         "numpy>=1.18.0",
     ],
+    extras_require={
+        "arrow": ["pyarrow"],
+        "excel": ["openpyxl"],
+    },
     entry_points={
         'console_scripts': [
             'topsis=topsis_samiksha_102317096.topsis:main',
+            'topsis-client=topsis_samiksha_102317096.client:main',
         ],
     },
 )
\ No newline at end of file
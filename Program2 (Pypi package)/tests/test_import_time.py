@@ -0,0 +1,38 @@
+"""Import-time budget for the CLI module.
+
+``topsis_samiksha_102317096.topsis`` must not load pandas at import; the
+plain CSV path never needs it. Each measurement runs in a fresh
+interpreter, and the best of a few runs is compared against the budget so
+a busy machine does not fail the test.
+"""
+import json
+import subprocess
+import sys
+
+# Milliseconds; NumPy accounts for most of it, pandas alone costs more
+IMPORT_BUDGET_MS = 300
+RUNS = 3
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import topsis_samiksha_102317096.topsis
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "pandas": "pandas" in sys.modules}))
+"""
+
+
+def _measure():
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_does_not_load_pandas():
+    assert not _measure()["pandas"]
+
+
+def test_import_time_within_budget():
+    best = min(_measure()["ms"] for _ in range(RUNS))
+    assert best < IMPORT_BUDGET_MS, f"import took {best:.0f} ms (budget {IMPORT_BUDGET_MS} ms)"
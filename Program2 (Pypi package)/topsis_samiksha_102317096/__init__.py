@@ -1,5 +1,38 @@
-from  .topsis import main, apply_topsis, validate_input
+import importlib
 
 __version__ = "0.1.0"
 __author__ = "Samiksha"
-__all__ = ['main', 'apply_topsis', 'validate_input']
\ No newline at end of file
+
+# Public names and the submodule defining each; submodules (and pandas) are
+# only imported on first access, so importing the package stays cheap
+_EXPORTS = {
+    'main': 'topsis', 'apply_topsis': 'topsis', 'validate_input': 'topsis', 'run_topsis': 'topsis',
+    'score_alternatives': 'topsis',
+    'topsis_scores': 'engine', 'dense_rank': 'engine', 'apply_topsis_batch': 'engine',
+    'select_top_k': 'engine', 'grouped_topsis_scores': 'engine', 'grouped_dense_rank': 'engine',
+    'TopsisIndex': 'incremental', 'PreparedMatrix': 'prepared',
+    'weight_sensitivity': 'sensitivity',
+    'load_input': 'validation', 'TopsisInputError': 'validation',
+    'ResultCache': 'cache', 'cached': 'cache', 'cache_key': 'cache',
+    'record_stages': 'profiling', 'StageRecorder': 'profiling',
+    'write_result': 'writers', 'ResultWriter': 'writers',
+}
+
+__all__ = ['main', 'apply_topsis', 'validate_input', 'run_topsis', 'score_alternatives', 'topsis_scores', 'dense_rank', 'apply_topsis_batch',
+           'select_top_k', 'grouped_topsis_scores', 'grouped_dense_rank', 'TopsisIndex', 'PreparedMatrix', 'weight_sensitivity',
+           'load_input', 'TopsisInputError',
+           'ResultCache', 'cached', 'cache_key',
+           'record_stages', 'StageRecorder',
+           'write_result', 'ResultWriter']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,159 @@
+import csv
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .topsis import _ArgumentParser, apply_topsis
+from .validation import load_input, TopsisInputError
+
+
+RESULT_SUFFIX = "-result.csv"
+
+
+def output_path_for(input_file, output_dir=None, base=None):
+    """Result path for ``input_file``: next to it, or under ``output_dir``.
+
+    With ``base``, the input's directory relative to ``base`` is mirrored
+    under ``output_dir``, so ``a/data.csv`` and ``b/data.csv`` do not
+    write to the same file.
+    """
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    if not output_dir:
+        directory = os.path.dirname(input_file)
+    elif base is None:
+        directory = output_dir
+    else:
+        relative = os.path.relpath(os.path.dirname(os.path.abspath(input_file)), base)
+        directory = os.path.normpath(os.path.join(output_dir, relative))
+    return os.path.join(directory, f"{stem}{RESULT_SUFFIX}")
+
+
+def output_paths(inputs, output_dir=None):
+    """One result path per input; raises ValueError if two would collide."""
+    base = None
+    if output_dir and inputs:
+        base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in inputs])
+
+    outputs, claimed = [], {}
+    for input_file in inputs:
+        output_file = output_path_for(input_file, output_dir, base)
+        key = os.path.normcase(os.path.abspath(output_file))
+        if key in claimed:
+            raise ValueError(f"{claimed[key]} and {input_file} would both write {output_file}")
+        claimed[key] = input_file
+        outputs.append(output_file)
+    return outputs
+
+
+def score_file(job):
+    """Run one file through load_input/apply_topsis.
+
+    Returns ``(input_file, output_file, error)``; ``error`` is None on
+    success, so one bad file never stops the batch.
+    """
+    input_file, weights, impacts, output_file = job
+
+    try:
+        dataframe, decision_matrix, weights, impacts = load_input(input_file, weights, impacts)
+        result = apply_topsis(dataframe, decision_matrix, weights, impacts)
+        result.to_csv(output_file, index=False)
+    except TopsisInputError as error:
+        messages = dict.fromkeys(detail["message"] for detail in error.errors)
+        return input_file, output_file, "; ".join(f"Error: {message}" for message in messages)
+    except Exception as error:
+        return input_file, output_file, f"Error: {error}"
+
+    return input_file, output_file, None
+
+
+def collect_inputs(patterns, manifest=None):
+    inputs = []
+    for pattern in patterns:
+        # A glob must not pick up the results of an earlier run
+        found = sorted(glob.glob(pattern, recursive=True))
+        inputs.extend([path for path in found if not path.endswith(RESULT_SUFFIX)]
+                      if found else [pattern])
+
+    if manifest:
+        with open(manifest) as handle:
+            inputs.extend(line.strip() for line in handle if line.strip())
+
+    return list(dict.fromkeys(inputs))
+
+
+def run_batch(inputs, weights, impacts, output_dir=None, workers=None, chunksize=16):
+    """Score many files in a process pool and return one summary row per file.
+
+    Raises ValueError, before scoring anything, if two inputs would write
+    the same result file.
+    """
+    outputs = output_paths(inputs, output_dir)
+    if output_dir:
+        for directory in dict.fromkeys(os.path.dirname(path) for path in outputs):
+            os.makedirs(directory, exist_ok=True)
+
+    jobs = [
+        (input_file, weights, impacts, output_file)
+        for input_file, output_file in zip(inputs, outputs)
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(score_file, jobs, chunksize=chunksize))
+
+
+def build_parser():
+    parser = _ArgumentParser(
+        prog="topsis batch",
+        usage="%(prog)s [options] <weights> <impacts> [<pattern> ...]",
+        description="Rank many input files with the same weights and impacts.",
+    )
+    parser.add_argument("weights")
+    parser.add_argument("impacts")
+    parser.add_argument("patterns", nargs="*", metavar="pattern",
+                        help="input files or glob patterns (quote them)")
+    parser.add_argument("--manifest", help="file listing one input path per line")
+    parser.add_argument("--output-dir",
+                        help="write results here instead of next to each input")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="files handed to a worker at a time (default: 16)")
+    parser.add_argument("--summary", help="also write the per-file summary to this CSV")
+    return parser
+
+
+def main(argv):
+    args = build_parser().parse_intermixed_args(argv)
+    inputs = collect_inputs(args.patterns, args.manifest)
+
+    if not inputs:
+        print("Error: No input files given")
+        sys.exit(1)
+
+    try:
+        summary = run_batch(
+            inputs, args.weights.split(','), args.impacts.split(','),
+            output_dir=args.output_dir, workers=args.workers, chunksize=args.chunksize,
+        )
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+    failed = 0
+    for input_file, output_file, error in summary:
+        if error:
+            failed += 1
+            print(f"FAILED {input_file}: {error}")
+        else:
+            print(f"OK     {input_file} -> {output_file}")
+
+    if args.summary:
+        with open(args.summary, 'w', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["input", "output", "status", "error"])
+            for input_file, output_file, error in summary:
+                writer.writerow([input_file, output_file, "failed" if error else "ok", error or ""])
+
+    print(f"{len(summary) - failed} of {len(summary)} files ranked, {failed} failed")
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,203 @@
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+_READ_BLOCK = 1 << 20
+
+
+def fingerprint(data):
+    """SHA-256 of the input content: bytes, a file path, a DataFrame or an ndarray."""
+    digest = hashlib.sha256()
+
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        digest.update(data)
+    elif isinstance(data, pd.DataFrame):
+        digest.update(repr(list(data.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif isinstance(data, np.ndarray):
+        digest.update(f"{data.dtype.str}{data.shape}".encode())
+        digest.update(np.ascontiguousarray(data).tobytes())
+    else:
+        with open(data, 'rb') as handle:
+            for block in iter(lambda: handle.read(_READ_BLOCK), b''):
+                digest.update(block)
+
+    return digest.hexdigest()
+
+
+def cache_key(data, weights, impacts, **options):
+    """Content address of an analysis.
+
+    Weights are normalized to sum to 1 (TOPSIS is invariant to scaling all
+    weights), so "1,1,2" and "2,2,4" share an entry. Raises ValueError for
+    weights that are not positive finite numbers, which would otherwise
+    share a key with valid ones (e.g. "-1,-1,-2").
+    """
+    weights = np.asarray(weights, dtype=float)
+    if not (np.isfinite(weights).all() and (weights > 0).all()):
+        raise ValueError("weights must be positive finite numbers")
+    shares = ",".join(f"{share:.12g}" for share in weights / weights.sum())
+    extra = ",".join(f"{name}={options[name]!r}" for name in sorted(options))
+    return hashlib.sha256(
+        f"{fingerprint(data)}|{shares}|{','.join(map(str, impacts))}|{extra}".encode()
+    ).hexdigest()
+
+
+def _size_of(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(_size_of(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size_of(item) for item in value)
+    if isinstance(value, np.ndarray) or hasattr(value, "nbytes"):
+        # Arrays, and objects such as PreparedMatrix that report their size
+        return value.nbytes
+    return sys.getsizeof(value)
+
+
+def _check_private(directory):
+    # Entries are unpickled, so only this user may be able to write them
+    if not hasattr(os, "getuid"):
+        return
+    status = os.stat(directory)
+    if status.st_uid != os.getuid():
+        raise PermissionError(f"Cache directory {directory} is not owned by the current user")
+    if status.st_mode & 0o022:
+        raise PermissionError(f"Cache directory {directory} is writable by other users")
+
+
+class ResultCache:
+    """LRU cache of analysis results with size and TTL eviction.
+
+    Entries live in memory up to ``max_entries`` items and ``max_bytes``
+    (estimated); with ``disk_dir`` set, results are also pickled there and
+    served from disk after being evicted from memory (or after a restart)
+    until ``ttl`` seconds have passed. ``stats()`` reports hit/miss counters.
+    ``disk_dir`` is created private (mode 0o700); an existing directory
+    owned by another user or writable by others raises PermissionError.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=256 * 2 ** 20, ttl=3600, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, mode=0o700, exist_ok=True)
+            _check_private(disk_dir)
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _evict(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+        self.evictions += 1
+
+    def _store(self, key, value, stored_at):
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (value, stored_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                value, stored_at, _ = self._entries[key]
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._evict(key)
+
+            if self.disk_dir:
+                path = self._disk_path(key)
+                try:
+                    stored_at = os.path.getmtime(path)
+                    if now - stored_at <= self.ttl:
+                        with open(path, 'rb') as handle:
+                            value = pickle.load(handle)
+                        self._store(key, value, stored_at)
+                        self.disk_hits += 1
+                        return value
+                    os.remove(path)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    pass
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, 'wb') as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+def cached(cache):
+    """Decorator for ``func(data, weights, impacts, **options)``.
+
+    Results are looked up by ``cache_key`` of the arguments; exceptions are
+    not cached. The wrapped function's return value is shared between
+    callers, so treat it as read-only.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(data, weights, impacts, **options):
+            try:
+                key = cache_key(data, weights, impacts, **options)
+            except (TypeError, ValueError):
+                # Weights that are not numbers: let func report them as usual
+                return func(data, weights, impacts, **options)
+            result = cache.get(key)
+            if result is None:
+                result = func(data, weights, impacts, **options)
+                cache.put(key, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
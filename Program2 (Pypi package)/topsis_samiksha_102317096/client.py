@@ -0,0 +1,64 @@
+"""``topsis-client``: the ``topsis`` command, run by a ``topsis serve`` daemon.
+
+Takes the same arguments as ``topsis``, sends them to the server on
+``$TOPSIS_SOCKET`` (or the default per-user socket) and prints what the
+command printed, exiting with its status. Only the standard library is
+imported, so a call costs little more than interpreter startup. When no
+server is listening, the command runs in this process instead, so scripts
+work either way.
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+
+
+def default_socket_path():
+    """``$TOPSIS_SOCKET``, or a per-user socket in the temp directory."""
+    # os.getuid does not exist on Windows
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.environ.get("TOPSIS_SOCKET") or os.path.join(
+        tempfile.gettempdir(), f"topsis-{user}.sock"
+    )
+
+
+def submit(argv, path=None, cwd=None):
+    """Run one command line on the server; returns its answer dict.
+
+    Raises OSError when no server can be reached on ``path``, including
+    on platforms without Unix sockets.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise ConnectionError("Unix domain sockets are not available on this platform")
+    job = {"id": os.getpid(), "argv": list(argv), "cwd": cwd or os.getcwd()}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path or default_socket_path())
+        connection.sendall((json.dumps(job) + "\n").encode("utf-8"))
+        connection.shutdown(socket.SHUT_WR)
+        with connection.makefile("rb") as answers:
+            line = answers.readline()
+    if not line:
+        raise ConnectionError("server closed the connection without answering")
+    return json.loads(line)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    try:
+        answer = submit(argv)
+    except OSError:
+        # No server reachable (none running, a socket we may not use, no
+        # Unix sockets at all): behave exactly like the topsis command
+        from .topsis import main as topsis_main
+        return topsis_main(argv)
+
+    sys.stdout.write(answer["stdout"])
+    sys.stderr.write(answer["stderr"])
+    sys.exit(answer["status"])
+
+
+if __name__ == "__main__":
+    main()
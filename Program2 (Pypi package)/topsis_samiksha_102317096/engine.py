@@ -0,0 +1,354 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .profiling import stage
+
+# Rows scored per block in the separation step; bounds the scratch buffer
+# to BLOCK_ROWS x criteria instead of a full-size temporary.
+BLOCK_ROWS = 65536
+
+
+def impact_mask(impacts):
+    """Return a boolean array that is True for benefit ('+') criteria."""
+    impacts = np.asarray(impacts)
+    if impacts.dtype == bool:
+        return impacts
+    return impacts == '+'
+
+
+def column_norms(matrix):
+    """Euclidean norm of every column, accumulated in float64."""
+    return np.sqrt(np.einsum('ij,ij->j', matrix, matrix, dtype=np.float64))
+
+
+def weighted_normalized(matrix, weights, dtype=np.float64, norms=None):
+    """Build the weighted normalized matrix in a single new buffer."""
+    if norms is None:
+        norms = column_norms(matrix)
+    scale = (np.asarray(weights, dtype=np.float64) / norms).astype(dtype)
+
+    weighted = np.empty(matrix.shape, dtype=dtype)
+    np.multiply(matrix, scale, out=weighted, casting='unsafe')
+    return weighted
+
+
+def ideal_solutions(weighted, impacts):
+    """Positive and negative ideal solutions selected with an impact mask."""
+    benefit = impact_mask(impacts)
+    column_max = weighted.max(axis=0)
+    column_min = weighted.min(axis=0)
+
+    positive_ideal = np.where(benefit, column_max, column_min)
+    negative_ideal = np.where(benefit, column_min, column_max)
+    return positive_ideal, negative_ideal
+
+
+def _separation_rows(weighted, positive_ideal, negative_ideal,
+                     distance_from_pis, distance_from_nis, start, stop, block_rows):
+    # Both distances are taken from each block while it is still in cache.
+    scratch = np.empty((min(stop - start, block_rows), weighted.shape[1]), dtype=weighted.dtype)
+
+    for block_start in range(start, stop, block_rows):
+        block_stop = min(block_start + block_rows, stop)
+        block = weighted[block_start:block_stop]
+        diff = scratch[:block_stop - block_start]
+
+        np.subtract(block, positive_ideal, out=diff)
+        np.square(diff, out=diff)
+        diff.sum(axis=1, out=distance_from_pis[block_start:block_stop])
+
+        np.subtract(block, negative_ideal, out=diff)
+        np.square(diff, out=diff)
+        diff.sum(axis=1, out=distance_from_nis[block_start:block_stop])
+
+    np.sqrt(distance_from_pis[start:stop], out=distance_from_pis[start:stop])
+    np.sqrt(distance_from_nis[start:stop], out=distance_from_nis[start:stop])
+
+
+def resolve_n_jobs(n_jobs):
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def separation_measures(weighted, positive_ideal, negative_ideal, block_rows=BLOCK_ROWS, n_jobs=1):
+    """Euclidean distance of every row from both ideals, scored block by block.
+
+    With ``n_jobs`` > 1 (or -1 for all cores) the rows are split into
+    contiguous ranges handled by a thread pool; NumPy releases the GIL for
+    the arithmetic, and each thread writes a disjoint slice of the outputs.
+    """
+    rows = weighted.shape[0]
+    distance_from_pis = np.empty(rows, dtype=weighted.dtype)
+    distance_from_nis = np.empty(rows, dtype=weighted.dtype)
+    arguments = (weighted, positive_ideal, negative_ideal, distance_from_pis, distance_from_nis)
+
+    n_jobs = min(resolve_n_jobs(n_jobs), -(-rows // block_rows))
+    if n_jobs <= 1:
+        _separation_rows(*arguments, 0, rows, block_rows)
+        return distance_from_pis, distance_from_nis
+
+    bounds = np.linspace(0, rows, n_jobs + 1).astype(int)
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [
+            executor.submit(_separation_rows, *arguments, start, stop, block_rows)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        for future in futures:
+            future.result()
+
+    return distance_from_pis, distance_from_nis
+
+
+def relative_closeness(distance_from_pis, distance_from_nis):
+    """TOPSIS score; reuses the PIS buffer for the denominator."""
+    denominator = np.add(distance_from_pis, distance_from_nis, out=distance_from_pis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.divide(distance_from_nis, denominator, out=distance_from_nis)
+
+
+def dense_rank(scores):
+    """Dense descending rank (1 = best), matching pandas' method='dense'.
+
+    A 2-D ``scores`` array is ranked column by column. NaN scores (e.g. 0/0
+    closeness when every alternative is identical) are left unranked: the
+    ranks are then returned as floats with NaN in those positions.
+    """
+    scores = np.asarray(scores)
+    # Rank along contiguous rows; the order among ties does not matter.
+    lanes = np.ascontiguousarray(scores.T)
+    order = np.argsort(-lanes, axis=-1)
+    ordered = np.take_along_axis(lanes, order, axis=-1)
+
+    step = np.ones(lanes.shape, dtype=np.int64)
+    step[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+
+    rank = np.empty_like(step)
+    np.put_along_axis(rank, order, np.cumsum(step, axis=-1), axis=-1)
+    return _unrank_nan(rank, lanes).T
+
+
+def _unrank_nan(rank, scores):
+    # NaN sorts last, so the ranks of the other scores are already right
+    unranked = np.isnan(scores)
+    if not unranked.any():
+        return rank
+    rank = rank.astype(np.float64)
+    rank[unranked] = np.nan
+    return rank
+
+
+def select_top_k(scores, k):
+    """Rows holding the ``k`` best scores, best first, with their dense ranks.
+
+    Uses ``np.argpartition`` instead of a full sort. Rows tied with the k-th
+    best score are all kept, so the result may be longer than ``k``; ranks
+    equal the dense ranks over the whole score vector. Rows with a NaN
+    score are unranked and never selected.
+    """
+    scores = np.asarray(scores)
+    if k <= 0:
+        raise ValueError("k must be positive")
+
+    if k < len(scores):
+        # NaN partitions last, so it only reaches the candidates when fewer
+        # than k scores are numbers
+        candidates = scores[np.argpartition(-scores, k - 1)[:k]]
+        candidates = candidates[~np.isnan(candidates)]
+        threshold = candidates.min() if len(candidates) else np.inf
+        selected = np.flatnonzero(scores >= threshold)
+    else:
+        selected = np.flatnonzero(~np.isnan(scores))
+
+    order = selected[np.argsort(-scores[selected], kind='stable')]
+    return order, dense_rank(scores[order])
+
+
+def topsis_scores(matrix, weights, impacts, dtype=np.float64, n_jobs=1):
+    """Score every row of a numeric decision matrix.
+
+    ``matrix`` is any 2-D array-like (rows = alternatives, columns =
+    criteria). ``dtype`` selects the working precision: ``np.float32``
+    halves the memory footprint of the intermediate buffer. ``n_jobs``
+    spreads the separation step over that many threads (-1 = all cores).
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("dtype must be float32 or float64")
+    matrix = np.asarray(matrix)
+
+    # STEP 1: Column norms
+    with stage("normalize"):
+        norms = column_norms(matrix)
+
+    # STEP 2: Normalize and weight in one pass
+    with stage("weight"):
+        weighted = weighted_normalized(matrix, weights, dtype=dtype, norms=norms)
+
+    # STEP 3: Positive & Negative Ideal Solutions
+    with stage("ideal"):
+        positive_ideal, negative_ideal = ideal_solutions(weighted, impacts)
+
+    # STEP 4-5: Separation measures and relative closeness
+    with stage("distance"):
+        distance_from_pis, distance_from_nis = separation_measures(
+            weighted, positive_ideal, negative_ideal, n_jobs=n_jobs
+        )
+        return relative_closeness(distance_from_pis, distance_from_nis)
+
+
+def _group_segments(groups):
+    """Stable sort order of the rows by group, the sorted group codes and
+    the first row of each group in that order."""
+    _, codes = np.unique(np.asarray(groups), return_inverse=True)
+    codes = codes.reshape(-1)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    return order, sorted_codes, starts
+
+
+def grouped_topsis_scores(matrix, weights, impacts, groups, dtype=np.float64):
+    """Score every row of ``matrix`` against the other rows of its group.
+
+    ``groups`` holds one label per row. The rows are sorted by group once,
+    and per-group column norms and ideals come from segmented reductions
+    (``np.add.reduceat`` / ``np.maximum.reduceat``) over the whole matrix,
+    so the cost does not grow with the number of groups.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("dtype must be float32 or float64")
+    benefit = impact_mask(impacts)
+    order, codes, starts = _group_segments(groups)
+    # Sorted copy of the rows, later weighted in place
+    weighted = np.asarray(matrix)[order].astype(dtype)
+
+    # STEP 1: Column norms per group
+    with stage("normalize"):
+        norms = np.sqrt(np.add.reduceat(
+            np.square(weighted, dtype=np.float64), starts, axis=0
+        ))
+
+    # STEP 2: Weighted normalized matrix
+    with stage("weight"):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = (np.asarray(weights, dtype=np.float64) / norms).astype(dtype)
+        weighted *= scale[codes]
+
+    # STEP 3: Ideal solutions per group
+    with stage("ideal"):
+        column_max = np.maximum.reduceat(weighted, starts, axis=0)
+        column_min = np.minimum.reduceat(weighted, starts, axis=0)
+        positive_ideal = np.where(benefit, column_max, column_min)
+        negative_ideal = np.where(benefit, column_min, column_max)
+
+    # STEP 4-5: Separation measures against the row's own group ideals
+    with stage("distance"):
+        diff = np.subtract(weighted, positive_ideal[codes])
+        distance_from_pis = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        np.subtract(weighted, negative_ideal[codes], out=diff)
+        distance_from_nis = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        sorted_scores = relative_closeness(distance_from_pis, distance_from_nis)
+
+    scores = np.empty_like(sorted_scores)
+    scores[order] = sorted_scores
+    return scores
+
+
+def grouped_dense_rank(scores, groups):
+    """Dense descending rank (1 = best) of every score within its group."""
+    scores = np.asarray(scores)
+    _, codes = np.unique(np.asarray(groups), return_inverse=True)
+    codes = codes.reshape(-1)
+
+    # Sort by group, then by descending score, in one lexsort
+    order = np.lexsort((-scores, codes))
+    ordered, ordered_codes = scores[order], codes[order]
+
+    new_group = np.r_[True, ordered_codes[1:] != ordered_codes[:-1]]
+    step = new_group.astype(np.int64)
+    step[1:] |= ordered[1:] != ordered[:-1]
+    running = np.cumsum(step)
+
+    # Restart the count at the first row of each group
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(order)), 0))
+    rank = np.empty_like(running)
+    rank[order] = running - running[group_start] + 1
+    return _unrank_nan(rank, scores)
+
+
+def normalize(matrix, dtype=np.float64):
+    """Unweighted normalized matrix with its per-column maximum and minimum."""
+    matrix = np.asarray(matrix)
+    norms = column_norms(matrix)
+    normalized = weighted_normalized(matrix, np.ones_like(norms), dtype=dtype, norms=norms)
+    return normalized, normalized.max(axis=0), normalized.min(axis=0)
+
+
+def scenario_coefficients(weights_2d, benefit_2d, dtype=np.float64):
+    """Coefficients that turn squared deviations into squared distances.
+
+    For positive weights the weighted ideal of scenario k is w_kj times the
+    column max or min, so
+        d+^2 = sum_j w_kj^2 * (x_ij - ideal_kj)^2
+    is a product of the squared deviations from the column extrema with
+    per-scenario coefficients. Output columns [:K] give d+^2, [K:] give d-^2.
+    """
+    squared_weights = np.asarray(weights_2d, dtype=np.float64).T ** 2
+    benefit = np.asarray(benefit_2d).T
+    from_max = np.where(benefit, squared_weights, 0.0)
+    from_min = np.where(benefit, 0.0, squared_weights)
+    return np.block([
+        [from_max, from_min],
+        [from_min, from_max],
+    ]).astype(dtype)
+
+
+def scenario_scores(normalized, column_max, column_min, coefficients, block_rows=BLOCK_ROWS):
+    """Rows x K scores of a normalized matrix for prepared scenario coefficients."""
+    rows, criteria = normalized.shape
+    scenarios = coefficients.shape[1] // 2
+    squared = np.empty((rows, 2 * scenarios), dtype=normalized.dtype)
+    scratch = np.empty((min(rows, block_rows), 2 * criteria), dtype=normalized.dtype)
+
+    for start in range(0, rows, block_rows):
+        stop = min(start + block_rows, rows)
+        block = normalized[start:stop]
+        deviations = scratch[:stop - start]
+
+        np.subtract(block, column_max, out=deviations[:, :criteria])
+        np.subtract(block, column_min, out=deviations[:, criteria:])
+        np.square(deviations, out=deviations)
+        np.matmul(deviations, coefficients, out=squared[start:stop])
+
+    np.sqrt(squared, out=squared)
+    return relative_closeness(squared[:, :scenarios], squared[:, scenarios:])
+
+
+def apply_topsis_batch(matrix, weights_2d, impacts_2d, dtype=np.float64, block_rows=BLOCK_ROWS):
+    """Score K weight/impact scenarios against one decision matrix.
+
+    ``weights_2d`` is K x criteria; ``impacts_2d`` is either K x criteria or
+    a single row shared by every scenario. The matrix is normalized once and
+    each row block is scored for all scenarios with one matrix product, so
+    the result is a rows x K score matrix.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("dtype must be float32 or float64")
+    weights_2d = np.atleast_2d(np.asarray(weights_2d, dtype=np.float64))
+    benefit = np.broadcast_to(impact_mask(np.atleast_2d(impacts_2d)), weights_2d.shape)
+
+    # STEP 1: Normalize once (unweighted)
+    normalized, column_max, column_min = normalize(matrix, dtype=dtype)
+
+    # STEP 2-3: Weights and ideals folded into per-scenario coefficients
+    coefficients = scenario_coefficients(weights_2d, benefit, dtype=dtype)
+
+    # STEP 4-5: Separation measures and closeness for every scenario
+    return scenario_scores(normalized, column_max, column_min, coefficients, block_rows)
@@ -0,0 +1,138 @@
+"""Pandas-free CLI path for plain CSV input.
+
+The file is parsed with the stdlib ``csv`` module straight into a NumPy
+matrix and the result is written back with ``csv.writer``, so a simple
+``topsis in.csv 1,1,1 +,-,+ out.csv`` never imports pandas. Anything the
+fast parser is unsure about (ragged rows, empty, NaN or non-numeric cells,
+names pandas would read as missing or boolean, integers beyond int64, too
+few columns), and any file over ``FAST_PATH_MAX_BYTES``, makes
+``topsis_csv`` return False; the caller then falls back to the pandas
+path, which reports the usual errors.
+"""
+import csv
+import os
+
+import numpy as np
+
+from .engine import topsis_scores, dense_rank, select_top_k
+from .profiling import stage
+
+# Beyond this size pandas' C parser and writer win back its import time
+FAST_PATH_MAX_BYTES = 4 * 2 ** 20
+
+# Name cells pandas reads as missing values or booleans, i.e. does not
+# write back as they were read
+_PANDAS_NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+_PANDAS_BOOL_VALUES = {"True", "TRUE", "true", "False", "FALSE", "false"}
+
+
+def _as_pandas_writes(texts, floats=None):
+    """Column values formatted the way pandas would read and write them back.
+
+    Returns None for integers beyond int64, which pandas keeps as uint64
+    or text rather than floats.
+    """
+    try:
+        return texts.astype(np.int64).tolist()
+    except OverflowError:
+        return None
+    except ValueError:
+        pass
+    if floats is not None:
+        return floats.tolist()
+    try:
+        return texts.astype(np.float64).tolist()
+    except ValueError:
+        return texts.tolist()
+
+
+def read_csv_matrix(input_file):
+    """Return ``(header, columns, matrix)`` or None if the file needs pandas.
+
+    ``columns`` holds every input column as a list of output values.
+    """
+    try:
+        with open(input_file, newline='', encoding='utf-8-sig') as handle:
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            rows = [row for row in reader if row]
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return None
+
+    if header is None or len(header) < 3 or not rows or len(set(header)) != len(header):
+        return None
+    width = len(header)
+    if any(len(row) != width for row in rows):
+        return None
+
+    cells = np.array(rows)
+    names = set(cells[:, 0].tolist())
+    if names & _PANDAS_NA_VALUES or names & _PANDAS_BOOL_VALUES:
+        return None
+    # NumPy's float parser accepts "1_000"; pandas would reject it
+    if (np.char.find(cells[:, 1:], '_') >= 0).any():
+        return None
+    try:
+        matrix = cells[:, 1:].astype(np.float64)
+    except ValueError:
+        return None
+    # "nan" parses; pandas reads it as a missing value and rejects it
+    if np.isnan(matrix).any():
+        return None
+    columns = [_as_pandas_writes(cells[:, 0])]
+    columns += [_as_pandas_writes(cells[:, j], matrix[:, j - 1]) for j in range(1, width)]
+    if any(column is None for column in columns):
+        return None
+    return header, columns, matrix
+
+
+def _cells(values):
+    # NaN (an unranked score) is written as an empty cell, as pandas does
+    if values.dtype.kind == 'f' and np.isnan(values).any():
+        return ['' if np.isnan(value) else value for value in values.tolist()]
+    return values.tolist()
+
+
+def write_csv(output_file, header, columns, scores, ranks, order=None):
+    if order is not None:
+        columns = [[column[i] for i in order] for column in columns]
+    with open(output_file, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle, lineterminator=os.linesep)
+        writer.writerow(header + ["Topsis Score", "Rank"])
+        writer.writerows(zip(*columns, _cells(scores), _cells(ranks)))
+
+
+def topsis_csv(input_file, weights, impacts, output_file, top_k=None, n_jobs=1):
+    """Score a plain CSV file without pandas; False means "use the pandas path"."""
+    from .topsis import validate_criteria
+
+    try:
+        if os.path.getsize(input_file) > FAST_PATH_MAX_BYTES:
+            return False
+    except OSError:
+        return False
+
+    with stage("parse"):
+        parsed = read_csv_matrix(input_file)
+    if parsed is None:
+        return False
+    header, columns, matrix = parsed
+
+    with stage("validate"):
+        weights, impacts = validate_criteria(weights, impacts, matrix.shape[1])
+    scores = topsis_scores(matrix, weights, impacts, n_jobs=n_jobs)
+
+    with stage("rank"):
+        if top_k is not None:
+            order, ranks = select_top_k(scores, top_k)
+            scores = scores[order]
+        else:
+            order, ranks = None, dense_rank(scores)
+
+    with stage("write"):
+        write_csv(output_file, header, columns, scores, ranks,
+                  None if order is None else order.tolist())
+    return True
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+from .engine import impact_mask, weighted_normalized, separation_measures, relative_closeness, dense_rank
+
+
+class TopsisIndex:
+    """Live TOPSIS ranking that absorbs inserts, updates and deletes.
+
+    Rows are kept column-major in a growable buffer. Per-criterion sums of
+    squares are updated in O(criteria) per change and re-summed exactly once
+    the number of subtractions exceeds the live row count, which bounds
+    floating-point drift. Column extrema are tracked with the number of rows
+    holding them: a change only rescans a column (one vectorized pass) when
+    the last holder of its minimum or maximum is removed. Scores and ranks
+    are recomputed lazily, and separately, the first time they are read
+    after a change.
+    """
+
+    def __init__(self, weights, impacts, capacity=1024, dtype=np.float64):
+        self.weights = np.array(weights, dtype=float)
+        self.benefit = impact_mask(impacts)
+        if len(self.weights) != len(self.benefit):
+            raise ValueError("Weights and impacts count must match")
+        if not all(self.weights > 0):
+            raise ValueError("Weights must be positive")
+        self.dtype = dtype
+
+        criteria = len(self.weights)
+        self._columns = np.zeros((criteria, capacity))
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._keys = np.empty(capacity, dtype=object)
+        self._slot_of = {}
+        self._free = []
+        self._high_water = 0
+
+        self._sum_of_squares = np.zeros(criteria)
+        self._subtractions = 0
+        self._column_max = np.full(criteria, -np.inf)
+        self._column_min = np.full(criteria, np.inf)
+        self._max_count = np.zeros(criteria, dtype=np.int64)
+        self._min_count = np.zeros(criteria, dtype=np.int64)
+        self._stale_extrema = set()
+
+        self._scores = None
+        self._ranks = None
+
+    @classmethod
+    def from_matrix(cls, keys, matrix, weights, impacts, dtype=np.float64):
+        matrix = np.asarray(matrix, dtype=float)
+        index = cls(weights, impacts, capacity=max(1024, len(matrix)), dtype=dtype)
+        index.insert_many(keys, matrix)
+        return index
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, key):
+        return key in self._slot_of
+
+    # ----- storage -----
+
+    def _allocate(self, count):
+        reused = [self._free.pop() for _ in range(min(count, len(self._free)))]
+        fresh = count - len(reused)
+
+        if self._high_water + fresh > self._columns.shape[1]:
+            capacity = max(2 * self._columns.shape[1], self._high_water + fresh)
+            columns = np.zeros((self._columns.shape[0], capacity))
+            columns[:, :self._high_water] = self._columns[:, :self._high_water]
+            self._columns = columns
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+            keys = np.empty(capacity, dtype=object)
+            keys[:self._high_water] = self._keys[:self._high_water]
+            self._keys = keys
+
+        slots = np.array(reused + list(range(self._high_water, self._high_water + fresh)), dtype=np.int64)
+        self._high_water += fresh
+        return slots
+
+    def _check_row(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.shape != (len(self.weights),):
+            raise ValueError("Row must have one value per criterion")
+        return values
+
+    # ----- statistics -----
+
+    def _add_rows(self, block):
+        self._sum_of_squares += np.einsum('ij,ij->j', block, block)
+
+        block_max = block.max(axis=0)
+        block_min = block.min(axis=0)
+        new_max = np.maximum(self._column_max, block_max)
+        new_min = np.minimum(self._column_min, block_min)
+
+        self._max_count = (np.where(self._column_max == new_max, self._max_count, 0)
+                           + (block == new_max).sum(axis=0))
+        self._min_count = (np.where(self._column_min == new_min, self._min_count, 0)
+                           + (block == new_min).sum(axis=0))
+        self._column_max = new_max
+        self._column_min = new_min
+
+    def _remove_row(self, values):
+        self._sum_of_squares -= values ** 2
+        self._subtractions += 1
+
+        self._max_count -= values == self._column_max
+        self._min_count -= values == self._column_min
+        self._stale_extrema.update(np.flatnonzero((self._max_count == 0) | (self._min_count == 0)))
+
+    def _refresh_statistics(self):
+        live = self._alive[:self._high_water]
+        columns = self._columns[:, :self._high_water]
+
+        if self._subtractions > len(self):
+            rows = columns[:, live]
+            self._sum_of_squares = np.einsum('ij,ij->i', rows, rows)
+            self._subtractions = 0
+
+        for j in sorted(self._stale_extrema):
+            column = columns[j, live]
+            if not len(column):
+                self._column_max[j], self._column_min[j] = -np.inf, np.inf
+                self._max_count[j] = self._min_count[j] = 0
+                continue
+            self._column_max[j] = column.max()
+            self._column_min[j] = column.min()
+            self._max_count[j] = np.count_nonzero(column == self._column_max[j])
+            self._min_count[j] = np.count_nonzero(column == self._column_min[j])
+        self._stale_extrema.clear()
+
+    def _invalidate(self):
+        self._scores = None
+        self._ranks = None
+
+    # ----- changes -----
+
+    def insert_many(self, keys, matrix):
+        keys = list(keys)
+        matrix = np.asarray(matrix, dtype=float)
+        if matrix.shape != (len(keys), len(self.weights)):
+            raise ValueError("Matrix must have one row per key and one column per criterion")
+        if len(set(keys)) != len(keys) or any(key in self._slot_of for key in keys):
+            raise KeyError("Keys must be unique")
+        if not keys:
+            return
+
+        slots = self._allocate(len(keys))
+        self._columns[:, slots] = matrix.T
+        self._alive[slots] = True
+        self._keys[slots] = keys
+        self._slot_of.update(zip(keys, slots.tolist()))
+
+        self._add_rows(matrix)
+        self._invalidate()
+
+    def insert(self, key, values):
+        self.insert_many([key], [self._check_row(values)])
+
+    def update(self, key, values):
+        values = self._check_row(values)
+        slot = self._slot_of[key]
+
+        self._remove_row(self._columns[:, slot].copy())
+        self._columns[:, slot] = values
+        self._add_rows(values[np.newaxis, :])
+        self._invalidate()
+
+    def delete(self, key):
+        slot = self._slot_of.pop(key)
+
+        self._remove_row(self._columns[:, slot].copy())
+        self._alive[slot] = False
+        self._keys[slot] = None
+        self._free.append(slot)
+        self._invalidate()
+
+    # ----- views -----
+
+    def _compute_scores(self):
+        self._refresh_statistics()
+        live = np.flatnonzero(self._alive[:self._high_water])
+        rows = self._columns[:, live].T
+
+        norms = np.sqrt(self._sum_of_squares)
+        scale = self.weights / norms
+        positive_ideal = np.where(self.benefit, self._column_max, self._column_min) * scale
+        negative_ideal = np.where(self.benefit, self._column_min, self._column_max) * scale
+
+        weighted = weighted_normalized(rows, self.weights, dtype=self.dtype, norms=norms)
+        scores = relative_closeness(*separation_measures(
+            weighted, positive_ideal.astype(self.dtype), negative_ideal.astype(self.dtype)
+        ))
+        return pd.Series(scores, index=pd.Index(self._keys[live], name="Key"), name="Topsis Score")
+
+    def scores(self):
+        """Topsis Score per key, refreshed if the index changed since the last read."""
+        if self._scores is None:
+            self._scores = self._compute_scores()
+        return self._scores
+
+    def ranks(self):
+        """Dense rank per key (1 = best)."""
+        if self._ranks is None:
+            scores = self.scores()
+            self._ranks = pd.Series(dense_rank(scores.to_numpy()), index=scores.index, name="Rank")
+        return self._ranks
+
+    def ranking(self):
+        """Scores and ranks of all live keys, best first."""
+        return pd.concat([self.scores(), self.ranks()], axis=1).sort_values("Rank", kind="stable")
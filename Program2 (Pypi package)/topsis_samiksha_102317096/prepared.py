@@ -0,0 +1,61 @@
+import numpy as np
+
+from .engine import (
+    BLOCK_ROWS, impact_mask, normalize, scenario_coefficients, relative_closeness, dense_rank,
+    select_top_k,
+)
+from .validation import check_criteria
+
+
+class PreparedMatrix:
+    """Decision matrix prepared once for scoring with many weights and impacts.
+
+    Normalization does not depend on the weights, and for positive weights
+    the ideals are the weighted column extrema of the normalized matrix. So
+    the squared deviations of every normalized value from its column maximum
+    and minimum are computed once (rows x 2*criteria), and scoring a new
+    weight/impact vector is one matrix product with the coefficients from
+    ``scenario_coefficients`` followed by the closeness step: a single
+    O(rows x criteria) pass with no re-normalization. Scores equal
+    ``topsis_scores`` up to rounding.
+    """
+
+    def __init__(self, matrix, dtype=np.float64, block_rows=BLOCK_ROWS):
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError("dtype must be float32 or float64")
+        self.dtype = dtype
+
+        normalized, self.column_max, self.column_min = normalize(matrix, dtype=dtype)
+        rows, criteria = normalized.shape
+        self.shape = (rows, criteria)
+
+        # Squared deviations from the column maximum, then from the minimum
+        self.deviations = np.empty((rows, 2 * criteria), dtype=dtype)
+        for start in range(0, rows, block_rows):
+            block = normalized[start:start + block_rows]
+            deviations = self.deviations[start:start + block_rows]
+            np.subtract(block, self.column_max, out=deviations[:, :criteria])
+            np.subtract(block, self.column_min, out=deviations[:, criteria:])
+            np.square(deviations, out=deviations)
+
+    @property
+    def nbytes(self):
+        return self.deviations.nbytes
+
+    def scores(self, weights, impacts):
+        """TOPSIS score of every row; raises TopsisInputError on bad weights or impacts."""
+        weights, impacts = check_criteria(weights, impacts, self.shape[1])
+        coefficients = scenario_coefficients(weights[None, :], impact_mask(impacts)[None, :],
+                                             dtype=self.dtype)
+        squared = self.deviations @ coefficients
+        np.sqrt(squared, out=squared)
+        return np.ascontiguousarray(relative_closeness(squared[:, 0], squared[:, 1]))
+
+    def rank(self, weights, impacts, top_k=None):
+        """``(rows, scores, ranks)``: every row in input order, or the ``top_k`` best first."""
+        scores = self.scores(weights, impacts)
+        if top_k is None:
+            return np.arange(len(scores)), scores, dense_rank(scores)
+        rows, ranks = select_top_k(scores, top_k)
+        return rows, scores[rows], ranks
@@ -0,0 +1,95 @@
+import contextvars
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+STAGES = ("parse", "validate", "normalize", "weight", "ideal", "distance", "rank", "write")
+
+_recorder = contextvars.ContextVar("topsis_stage_recorder", default=None)
+
+# tracemalloc.reset_peak is Python 3.9+; before that only the net growth
+# of traced memory over a stage can be measured
+_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+
+
+class StageRecorder:
+    """Collects the duration (and optionally allocated bytes) of each stage.
+
+    ``stages`` lists ``{"stage", "seconds", "allocated_bytes"}`` dicts in
+    the order the stages ran; ``callback(stage, seconds, allocated_bytes)``
+    is also called as each one finishes. ``allocated_bytes`` is the
+    tracemalloc peak above the starting point (the net growth on Python
+    3.8), or None unless ``memory``.
+    """
+
+    def __init__(self, callback=None, memory=False):
+        self.callback = callback
+        self.memory = memory
+        self.stages = []
+
+    def record(self, name, seconds, allocated_bytes=None):
+        self.stages.append({"stage": name, "seconds": seconds, "allocated_bytes": allocated_bytes})
+        if self.callback is not None:
+            self.callback(name, seconds, allocated_bytes)
+
+    def totals(self):
+        """Seconds per stage name, summed over repeated stages."""
+        totals = {}
+        for entry in self.stages:
+            totals[entry["stage"]] = totals.get(entry["stage"], 0.0) + entry["seconds"]
+        return totals
+
+    def report(self):
+        lines = [f"{'Stage':<10} {'Time (ms)':>10} {'Allocated (KiB)':>16}"]
+        for entry in self.stages:
+            allocated = entry["allocated_bytes"]
+            allocated = "-" if allocated is None else f"{allocated / 1024:.1f}"
+            lines.append(f"{entry['stage']:<10} {entry['seconds'] * 1000:>10.2f} {allocated:>16}")
+        total = sum(entry["seconds"] for entry in self.stages)
+        lines.append(f"{'total':<10} {total * 1000:>10.2f}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def record_stages(callback=None, memory=False):
+    """Record every pipeline stage run inside the block.
+
+    The recorder is bound to the current context (thread or task), so
+    concurrent requests each see only their own stages. ``memory=True``
+    runs tracemalloc for the duration of the block, which slows it down.
+    """
+    recorder = StageRecorder(callback, memory)
+    token = _recorder.set(recorder)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield recorder
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _recorder.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time one pipeline stage; a no-op unless a recorder is active."""
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+
+    if recorder.memory:
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        if _RESET_PEAK:
+            tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        allocated = None
+        if recorder.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            allocated = max((peak if _RESET_PEAK else current) - start_bytes, 0)
+        recorder.record(name, seconds, allocated)
@@ -0,0 +1,183 @@
+import os
+
+import numpy as np
+
+NPY_EXTENSIONS = ('.npy',)
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+FEATHER_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+
+# .xlsx workbooks are zip archives
+ZIP_MAGIC = b'PK\x03\x04'
+
+
+class MissingDependencyError(ImportError):
+    pass
+
+
+def _pyarrow(module):
+    try:
+        if module == 'parquet':
+            import pyarrow.parquet as reader
+        else:
+            import pyarrow.feather as reader
+    except ImportError:
+        raise MissingDependencyError(
+            "Reading Parquet/Feather files requires pyarrow (pip install pyarrow)"
+        )
+    return reader
+
+
+def _openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise MissingDependencyError(
+            "Reading Excel files requires openpyxl (pip install openpyxl)"
+        )
+    return openpyxl
+
+
+def input_format(input_file):
+    extension = os.path.splitext(str(input_file))[1].lower()
+    if extension in NPY_EXTENSIONS:
+        return 'npy'
+    if extension in PARQUET_EXTENSIONS:
+        return 'parquet'
+    if extension in FEATHER_EXTENSIONS:
+        return 'feather'
+    if extension in XLSX_EXTENSIONS:
+        return 'xlsx'
+    return 'csv'
+
+
+def numeric_block(dataframe):
+    """Criteria columns of ``dataframe``; only non-float columns are re-cast."""
+    from pandas.api.types import is_float_dtype
+
+    criteria = dataframe.iloc[:, 1:]
+    if all(is_float_dtype(dtype) for dtype in criteria.dtypes):
+        return criteria
+    return criteria.astype(float)
+
+
+def _read_npy(input_file, columns=None):
+    return frame_from_matrix(np.load(input_file, mmap_mode='r'), columns)
+
+
+def frame_from_matrix(matrix, columns=None):
+    """Wrap a bare 2-D numeric array; the array itself stays the matrix."""
+    if matrix.ndim != 2 or not np.issubdtype(matrix.dtype, np.number):
+        raise ValueError("a matrix input must be a 2-D numeric array")
+    import pandas as pd
+
+    names = [f"C{i + 1}" for i in range(matrix.shape[1])]
+    if columns is not None:
+        matrix = matrix[:, [names.index(name) for name in columns[1:]]]
+        names = list(columns[1:])
+
+    dataframe = pd.DataFrame(matrix, columns=names, copy=False)
+    dataframe.insert(0, "Alternative", np.arange(1, matrix.shape[0] + 1))
+    return dataframe, matrix
+
+
+def read_xlsx(source, columns=None, sheet=None):
+    """Read one worksheet of an .xlsx workbook (a path or binary file-like).
+
+    The workbook is opened in openpyxl's read-only mode and rows are streamed
+    straight into a preallocated float array, without loading the whole
+    sheet first. ``sheet`` picks a worksheet by name (default: the first)
+    and ``columns`` lists the name column first, then the criteria to keep.
+    Returns ``(dataframe, decision_matrix)``; a column holding text is kept
+    as text in the frame and the matrix is then None, so validation can
+    report it.
+    """
+    import pandas as pd
+
+    workbook = _openpyxl().load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("worksheet is empty")
+        header = [f"Unnamed: {j}" if name is None else str(name) for j, name in enumerate(header)]
+        while header and header[-1].startswith("Unnamed: "):
+            header.pop()
+        names = list(columns) if columns is not None else header
+        index = [header.index(name) for name in names]
+
+        # The sheet dimension is a hint only; grow if it was too small
+        capacity = max((worksheet.max_row or 0) - 1, 16)
+        labels = np.empty(capacity, dtype=object)
+        values = np.empty((capacity, len(index) - 1), dtype=np.float64)
+        text = {}
+        count = 0
+
+        for row in rows:
+            cells = [row[j] if j < len(row) else None for j in index]
+            if all(cell is None for cell in cells):
+                continue
+            if count == capacity:
+                capacity *= 2
+                labels = np.resize(labels, capacity)
+                values = np.resize(values, (capacity, values.shape[1]))
+                text = {k: np.resize(column, capacity) for k, column in text.items()}
+
+            labels[count] = cells[0]
+            try:
+                values[count] = cells[1:]
+            except (TypeError, ValueError):
+                for k, cell in enumerate(cells[1:]):
+                    if k not in text:
+                        try:
+                            values[count, k] = cell
+                            continue
+                        except (TypeError, ValueError):
+                            text[k] = values[:, k].astype(object)
+                    text[k][count] = cell
+            else:
+                for k, column in text.items():
+                    column[count] = values[count, k]
+            count += 1
+    finally:
+        workbook.close()
+
+    dataframe = pd.DataFrame(values[:count], columns=names[1:], copy=False)
+    for k, column in text.items():
+        dataframe[names[k + 1]] = column[:count]
+    dataframe.insert(0, names[0], labels[:count])
+    return dataframe, (None if text else values[:count])
+
+
+def read_table(input_file, columns=None, sheet=None):
+    """Load an input file and return ``(dataframe, decision_matrix)``.
+
+    CSV goes through ``pd.read_csv`` and Parquet/Feather through pyarrow with
+    the ``columns`` projection pushed down to the reader; for these the
+    matrix is ``None`` and is taken from the frame by ``numeric_block``.
+    ``.npy`` files are memory-mapped and returned as the matrix itself, with
+    every column a criterion (C1, C2, ...) and alternatives numbered.
+    ``.xlsx`` workbooks are streamed by ``read_xlsx`` (``sheet`` picks the
+    worksheet). ``columns`` lists the name column first, then the criteria
+    to keep.
+    """
+    import pandas as pd
+
+    file_format = input_format(input_file)
+
+    if file_format == 'npy':
+        return _read_npy(input_file, columns)
+    if file_format == 'xlsx':
+        return read_xlsx(input_file, columns, sheet)
+
+    if file_format == 'csv':
+        dataframe = pd.read_csv(input_file, usecols=columns)
+    else:
+        table = _pyarrow(file_format).read_table(input_file, columns=columns, memory_map=True)
+        dataframe = table.to_pandas()
+
+    if columns is not None:
+        dataframe = dataframe[list(columns)]
+    return dataframe, None
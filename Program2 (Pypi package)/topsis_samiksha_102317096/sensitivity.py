@@ -0,0 +1,160 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .engine import (
+    impact_mask, normalize, scenario_coefficients, scenario_scores, dense_rank, resolve_n_jobs,
+)
+
+# Rough bytes held per (alternative, draw) pair while a chunk is scored and
+# ranked: squared distances, scores, sort order, ranks and comparisons.
+_BYTES_PER_CELL = 64
+
+
+def perturbed_weights(weights, draws, jitter=0.1, method='uniform', seed=None):
+    """``draws`` x criteria weight vectors around ``weights``.
+
+    ``uniform`` scales every weight by an independent factor in
+    [1 - jitter, 1 + jitter]. ``dirichlet`` draws weight shares from a
+    Dirichlet centred on the normalized weights, with the concentration
+    chosen so a share's relative spread is roughly ``jitter``.
+    """
+    weights = np.asarray(weights, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    if method == 'uniform':
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in [0, 1) for uniform perturbation")
+        return weights * rng.uniform(1 - jitter, 1 + jitter, size=(draws, len(weights)))
+
+    if method == 'dirichlet':
+        shares = weights / weights.sum()
+        concentration = max((1 - shares.min()) / (shares.min() * jitter ** 2) - 1, 1.0)
+        return rng.dirichlet(shares * concentration, size=draws) * weights.sum()
+
+    raise ValueError("method must be 'uniform' or 'dirichlet'")
+
+
+def _lane_ranks(scores):
+    """Dense descending rank (1 = best) along each row of a draws x alternatives array.
+
+    ``dense_rank`` for the sensitivity loop: scores must be NaN-free, and
+    an ascending sort skips the negated copy. Ranks are int32.
+    """
+    order = np.argsort(scores, axis=1)
+    ordered = np.take_along_axis(scores, order, axis=1)
+
+    ascending = np.empty(scores.shape, dtype=np.int32)
+    ascending[:, 0] = 1
+    np.not_equal(ordered[:, 1:], ordered[:, :-1], out=ascending[:, 1:])
+    np.cumsum(ascending, axis=1, out=ascending)
+
+    # The highest score holds the last ascending rank, i.e. rank 1
+    descending = ascending[:, -1:] + 1 - ascending
+    rank = np.empty_like(descending)
+    np.put_along_axis(rank, order, descending, axis=1)
+    return rank
+
+
+def _draw_statistics(normalized, column_max, column_min, benefit, chunk_weights, baseline,
+                     histogram_ranks, dtype):
+    # Rank statistics of one chunk of draws, summed over its draws
+    coefficients = scenario_coefficients(
+        chunk_weights, np.broadcast_to(benefit, chunk_weights.shape), dtype
+    )
+    scores = np.ascontiguousarray(scenario_scores(normalized, column_max, column_min, coefficients).T)
+    ranks = _lane_ranks(scores)
+    del scores
+
+    # Reductions over axis 0 run across all alternatives at once
+    return (
+        ranks.sum(axis=0, dtype=np.int64),
+        np.einsum('ij,ij->j', ranks, ranks, dtype=np.float64),
+        ranks.min(axis=0),
+        ranks.max(axis=0),
+        np.stack([np.count_nonzero(ranks == r + 1, axis=0) for r in range(histogram_ranks)], axis=1),
+        np.count_nonzero(ranks != baseline, axis=0),
+    )
+
+
+def weight_sensitivity(matrix, weights, impacts, draws=10000, jitter=0.1, method='uniform',
+                       seed=None, memory_budget=256 * 2 ** 20, histogram_ranks=3,
+                       dtype=np.float64, n_jobs=1):
+    """Monte Carlo stability of the ranking under perturbed weights.
+
+    The matrix is normalized once; draws are scored in chunks sized to
+    ``memory_budget`` bytes, each chunk with one matrix product and one
+    row-wise dense rank. Returns one row per alternative with the
+    baseline rank, the mean/std/best/worst rank over all draws, the share
+    of draws in which it holds each of the first ``histogram_ranks`` ranks
+    and the number of draws in which its rank differs from the baseline.
+
+    Every draw ranks all alternatives with a full sort, so the cost grows
+    as draws x n log n and the sort dominates: on one core, 100,000 draws
+    take about 2 s for 1,000 x 20 and about 25 s for 10,000 x 20 (some
+    4,000 draws/s). With ``n_jobs`` > 1 (or -1 for all cores) chunks of
+    draws are scored and ranked in a thread pool, sharing ``memory_budget``.
+    """
+    weights = np.asarray(weights, dtype=float)
+    benefit = impact_mask(impacts)
+    normalized, column_max, column_min = normalize(matrix, dtype=dtype)
+
+    baseline_coefficients = scenario_coefficients(weights[np.newaxis, :], benefit[np.newaxis, :], dtype)
+    baseline = dense_rank(scenario_scores(normalized, column_max, column_min, baseline_coefficients))[:, 0]
+    # A NaN score (0/0 closeness) does not depend on the weights, so those
+    # rows are unranked in every draw too and left out of the draws
+    unranked = np.isnan(baseline)
+    if unranked.any():
+        normalized = normalized[~unranked]
+    rows = normalized.shape[0]
+    ranked_baseline = baseline[~unranked].astype(np.int32)
+
+    rank_sum = np.zeros(rows, dtype=np.int64)
+    rank_square_sum = np.zeros(rows)
+    best = np.full(rows, np.iinfo(np.int32).max, dtype=np.int32)
+    worst = np.zeros(rows, dtype=np.int32)
+    rank_counts = np.zeros((rows, histogram_ranks), dtype=np.int64)
+    changes = np.zeros(rows, dtype=np.int64)
+
+    sampled = perturbed_weights(weights, draws, jitter=jitter, method=method, seed=seed)
+    n_jobs = resolve_n_jobs(n_jobs)
+    chunk = max(1, int(memory_budget // (max(rows, 1) * _BYTES_PER_CELL * n_jobs)))
+
+    def run(start):
+        return _draw_statistics(normalized, column_max, column_min, benefit,
+                                sampled[start:start + chunk], ranked_baseline, histogram_ranks, dtype)
+
+    starts = range(0, draws, chunk) if rows else ()
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        for chunk_sum, chunk_square_sum, chunk_best, chunk_worst, chunk_counts, chunk_changes in (
+            executor.map(run, starts) if n_jobs > 1 else map(run, starts)
+        ):
+            rank_sum += chunk_sum
+            rank_square_sum += chunk_square_sum
+            np.minimum(best, chunk_best, out=best)
+            np.maximum(worst, chunk_worst, out=worst)
+            rank_counts += chunk_counts
+            changes += chunk_changes
+
+    mean_rank = rank_sum / draws
+    summary = {
+        "Rank": ranked_baseline.astype(np.int64),
+        "Mean Rank": mean_rank,
+        "Rank Std": np.sqrt(np.maximum(rank_square_sum / draws - mean_rank ** 2, 0.0)),
+        "Best Rank": best.astype(np.int64),
+        "Worst Rank": worst.astype(np.int64),
+    }
+    for r in range(histogram_ranks):
+        summary[f"P(Rank {r + 1})"] = rank_counts[:, r] / draws
+    summary["Rank Changes"] = changes
+
+    if unranked.any():
+        # Back to one row per alternative, with the unranked rows empty
+        expanded = {}
+        for name, values in summary.items():
+            expanded[name] = np.full(len(unranked), np.nan)
+            expanded[name][~unranked] = values
+        summary = expanded
+
+    return pd.DataFrame(summary)
@@ -0,0 +1,258 @@
+"""Long-lived ``topsis serve`` daemon.
+
+Jobs are NDJSON objects, one per line, read from stdin or from a Unix
+domain socket::
+
+    {"id": 1, "argv": ["in.csv", "1,1,1", "+,-,+", "out.csv"], "cwd": "/data"}
+
+``argv`` takes exactly the arguments of the ``topsis`` command and ``cwd``
+(optional) is where relative paths are resolved. Each job runs
+``topsis.main`` in a pool of worker processes that imported NumPy and pandas
+once at startup (replaced if a worker dies), and is answered with one line::
+
+    {"id": 1, "status": 0, "stdout": "TOPSIS result saved to out.csv\\n", "stderr": ""}
+
+``status`` is the exit status the command would have had. On stdin, answers
+are written as jobs finish, so match them up by ``id``; on the socket each
+connection gets its answers in order.
+"""
+import contextlib
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .client import default_socket_path
+from .topsis import _ArgumentParser
+
+# Jobs without a "cwd" run where the server was started
+_START_DIR = os.getcwd()
+
+
+def _warm_up():
+    # Runs once in every worker, so jobs start with the imports done
+    import pandas  # noqa: F401
+    from . import topsis, fastpath, readers, validation, sensitivity, stream  # noqa: F401
+
+
+def run_job(job):
+    """Run one ``topsis`` command line in this process; returns the answer dict."""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            argv = [str(argument) for argument in job["argv"]]
+            if argv[:1] == ["serve"]:
+                print("Error: serve cannot be run as a job")
+                sys.exit(2)
+            try:
+                os.chdir(job.get("cwd") or _START_DIR)
+            except OSError:
+                print("Error: Cannot change to directory", job.get("cwd"))
+                sys.exit(1)
+            from .topsis import main
+            status = main(argv) or 0
+        except SystemExit as exit_:
+            if exit_.code is None:
+                status = 0
+            elif isinstance(exit_.code, int):
+                status = exit_.code
+            else:
+                print(exit_.code, file=sys.stderr)
+                status = 1
+        except Exception:
+            traceback.print_exc()
+            status = 1
+    return {"id": job.get("id"), "status": status,
+            "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def _failed(job, message):
+    return {"id": job.get("id"), "status": 1, "stdout": "", "stderr": f"Error: {message}\n"}
+
+
+class WorkerPool:
+    """Warm worker processes that survive a worker dying.
+
+    A worker killed mid-job (out of memory, a crash in native code) breaks
+    a ``ProcessPoolExecutor`` for good; the pool is then replaced and the
+    jobs that were running on it are retried once, so only a job that
+    keeps killing its worker fails.
+    """
+
+    def __init__(self, workers=None, retries=1):
+        self.workers = workers
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+
+    def _replace(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False)
+                self._executor = self._start()
+                print("A worker process died; worker pool restarted", file=sys.stderr)
+
+    def submit(self, job):
+        """Run ``job`` on a worker; returns a Future of its answer dict."""
+        answer = Future()
+
+        def attempt(retries):
+            executor = self._executor
+            try:
+                future = executor.submit(run_job, job)
+            except (BrokenProcessPool, RuntimeError):
+                # Broken, or shut down by another thread replacing it
+                self._replace(executor)
+                if retries:
+                    attempt(retries - 1)
+                else:
+                    answer.set_result(_failed(job, "the worker pool is not available"))
+                return
+
+            def done(future):
+                error = future.exception()
+                if error is None:
+                    answer.set_result(future.result())
+                elif isinstance(error, BrokenProcessPool):
+                    self._replace(executor)
+                    if retries:
+                        attempt(retries - 1)
+                    else:
+                        answer.set_result(_failed(job, "the worker process running this job died"))
+                else:
+                    answer.set_result(_failed(job, error))
+
+            future.add_done_callback(done)
+
+        attempt(self.retries)
+        return answer
+
+    def shutdown(self):
+        with self._lock:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def parse_job(line):
+    """Decode one NDJSON line; returns ``(job, None)`` or ``(None, error answer)``."""
+    try:
+        job = json.loads(line)
+        if not isinstance(job, dict) or not isinstance(job.get("argv"), list):
+            raise ValueError('a job must be an object with an "argv" list')
+    except ValueError as error:
+        return None, {"id": None, "status": 2, "stdout": "", "stderr": f"Error: Invalid job: {error}\n"}
+    return job, None
+
+
+def _encode(answer):
+    return (json.dumps(answer) + "\n").encode("utf-8")
+
+
+def serve_stdin(pool, stdin=None, stdout=None):
+    """Answer jobs from stdin until EOF, in the order they finish."""
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    lock = threading.Lock()
+
+    def reply(answer):
+        with lock:
+            stdout.write(_encode(answer))
+            stdout.flush()
+
+    futures = []
+    for line in stdin:
+        if not line.strip():
+            continue
+        job, error = parse_job(line)
+        if error:
+            reply(error)
+            continue
+        future = pool.submit(job)
+        future.add_done_callback(lambda done: reply(done.result()))
+        futures.append(future)
+
+    for future in futures:
+        future.result()
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            job, answer = parse_job(line)
+            if job is not None:
+                answer = self.server.pool.submit(job).result()
+            self.wfile.write(_encode(answer))
+            self.wfile.flush()
+
+
+class JobServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, pool):
+        self.pool = pool
+        # A socket left behind by a server that did not shut down cleanly
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        super().__init__(path, _JobHandler)
+        os.chmod(path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.server_address)
+
+
+def build_parser():
+    parser = _ArgumentParser(
+        prog="topsis serve",
+        usage="%(prog)s [--socket PATH | --stdin] [--workers N]",
+        description="Run TOPSIS jobs sent as NDJSON, with the imports already warm.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--socket", metavar="PATH",
+                        help="Unix socket to listen on (default: $TOPSIS_SOCKET or a "
+                             "per-user socket in the temp directory)")
+    source.add_argument("--stdin", action="store_true",
+                        help="read jobs from stdin and answer on stdout instead")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    return parser
+
+
+def main(argv):
+    args = build_parser().parse_args(argv)
+
+    if args.workers is not None and args.workers <= 0:
+        print("Error: --workers must be a positive integer")
+        sys.exit(1)
+
+    with WorkerPool(args.workers) as pool:
+        if args.stdin:
+            serve_stdin(pool)
+            return
+
+        path = args.socket or default_socket_path()
+        # Stop cleanly (and remove the socket) on kill as well as Ctrl+C
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        with JobServer(path, pool) as server:
+            print("TOPSIS server listening on", path, file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
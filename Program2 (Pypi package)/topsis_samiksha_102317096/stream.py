@@ -0,0 +1,174 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+from .engine import impact_mask, weighted_normalized, separation_measures, relative_closeness
+from .topsis import validate_criteria
+from .writers import ResultWriter, select_columns
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _read_chunks(input_file, chunksize):
+    try:
+        for chunk in pd.read_csv(input_file, chunksize=chunksize):
+            if chunk.shape[1] < 3:
+                print("Error: Input file must contain at least 3 columns")
+                sys.exit(1)
+            try:
+                block = chunk.iloc[:, 1:].to_numpy(dtype=float)
+            except (ValueError, TypeError):
+                print("Error: From 2nd column onward, values must be numeric")
+                sys.exit(1)
+            if np.isnan(block).any():
+                print("Error: Input file contains missing values")
+                sys.exit(1)
+            yield chunk, block
+    except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError):
+        print("Error: Cannot read input file")
+        sys.exit(1)
+
+
+def column_statistics(input_file, chunksize=DEFAULT_CHUNKSIZE):
+    """Pass 1: row count, per-column sum of squares, minimum and maximum."""
+    rows = 0
+    sum_of_squares = column_min = column_max = None
+
+    for _, block in _read_chunks(input_file, chunksize):
+        if not len(block):
+            continue
+        if sum_of_squares is None:
+            sum_of_squares = np.zeros(block.shape[1])
+            column_min = np.full(block.shape[1], np.inf)
+            column_max = np.full(block.shape[1], -np.inf)
+
+        rows += len(block)
+        sum_of_squares += np.einsum('ij,ij->j', block, block)
+        np.minimum(column_min, block.min(axis=0), out=column_min)
+        np.maximum(column_max, block.max(axis=0), out=column_max)
+
+    return rows, sum_of_squares, column_min, column_max
+
+
+def _merge_distinct(runs, distinct, block_rows):
+    """k-way merge of ascending, de-duplicated runs into ``distinct``.
+
+    Every step emits the values that no run can still undercut: all values up
+    to the smallest "last loaded" value among runs that have data left on
+    disk. Memory stays at one block per run. Returns the distinct count.
+    """
+    positions = [0] * len(runs)
+    pending = [np.empty(0)] * len(runs)
+    written = 0
+
+    while True:
+        for i, run in enumerate(runs):
+            if not len(pending[i]) and positions[i] < len(run):
+                pending[i] = np.asarray(run[positions[i]:positions[i] + block_rows])
+                positions[i] += len(pending[i])
+
+        if not any(len(values) for values in pending):
+            return written
+
+        threshold = min(
+            (values[-1] for i, values in enumerate(pending)
+             if len(values) and positions[i] < len(runs[i])),
+            default=np.inf,
+        )
+
+        batch = np.unique(np.concatenate([values[values <= threshold] for values in pending]))
+        pending = [values[values > threshold] for values in pending]
+
+        if written:
+            batch = batch[batch > distinct[written - 1]]
+        distinct[written:written + len(batch)] = batch
+        written += len(batch)
+
+
+def topsis_stream(input_file, weights, impacts, output_file,
+                  chunksize=DEFAULT_CHUNKSIZE, dtype=np.float64, temp_dir=None, output_columns=None):
+    """Score a CSV that does not fit in memory, ``chunksize`` rows at a time.
+
+    Pass 1 gathers column statistics, pass 2 scores each chunk into an
+    on-disk score array and a sorted run of its distinct scores, the runs are
+    merged into one sorted array of distinct scores, and pass 3 looks up each
+    exact dense rank and appends the chunk to ``output_file`` (any format
+    ``ResultWriter`` supports, keeping only ``output_columns`` if given).
+    """
+    if not os.path.exists(input_file):
+        print("Error: Input file not found")
+        sys.exit(1)
+
+    # Check the criteria against the header before reading any data
+    try:
+        header = pd.read_csv(input_file, nrows=0).columns
+    except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError):
+        print("Error: Cannot read input file")
+        sys.exit(1)
+    if len(header) < 3:
+        print("Error: Input file must contain at least 3 columns")
+        sys.exit(1)
+    weights, impacts = validate_criteria(weights, impacts, len(header) - 1)
+
+    # PASS 1: Column statistics
+    rows, sum_of_squares, column_min, column_max = column_statistics(input_file, chunksize)
+    if rows == 0:
+        print("Error: Input file has no data rows")
+        sys.exit(1)
+
+    norms = np.sqrt(sum_of_squares)
+    scale = weights / norms
+    benefit = impact_mask(impacts)
+    positive_ideal = np.where(benefit, column_max * scale, column_min * scale).astype(dtype)
+    negative_ideal = np.where(benefit, column_min * scale, column_max * scale).astype(dtype)
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as workdir:
+        # PASS 2: Score chunks, spill scores and sorted distinct runs to disk
+        scores = open_memmap(os.path.join(workdir, "scores.npy"), mode='w+',
+                             dtype=np.float64, shape=(rows,))
+        runs = []
+        unranked = 0
+        offset = 0
+        for _, block in _read_chunks(input_file, chunksize):
+            weighted = weighted_normalized(block, weights, dtype=dtype, norms=norms)
+            chunk_scores = relative_closeness(
+                *separation_measures(weighted, positive_ideal, negative_ideal)
+            )
+            scores[offset:offset + len(block)] = chunk_scores
+            offset += len(block)
+
+            # NaN scores (0/0 closeness) stay out of the runs and unranked
+            nan_scores = np.isnan(chunk_scores)
+            unranked += np.count_nonzero(nan_scores)
+            run_path = os.path.join(workdir, f"run_{len(runs)}.npy")
+            np.save(run_path, np.unique(chunk_scores[~nan_scores]))
+            runs.append(np.load(run_path, mmap_mode='r'))
+
+        # MERGE: Sorted distinct scores across all chunks
+        distinct = open_memmap(os.path.join(workdir, "distinct.npy"), mode='w+',
+                               dtype=np.float64, shape=(rows,))
+        distinct_count = _merge_distinct(runs, distinct, max(1, chunksize // len(runs)))
+        distinct = distinct[:distinct_count]
+
+        # PASS 3: Exact dense rank and append to the output file
+        offset = 0
+        with ResultWriter(output_file, rows=rows) as writer:
+            for chunk, block in _read_chunks(input_file, chunksize):
+                chunk_scores = np.asarray(scores[offset:offset + len(block)])
+                offset += len(block)
+
+                chunk["Topsis Score"] = chunk_scores
+                rank = distinct_count - np.searchsorted(distinct, chunk_scores)
+                if unranked:
+                    # Float ranks in every chunk, so all chunks share one column type
+                    rank = np.where(np.isnan(chunk_scores), np.nan, rank)
+                chunk["Rank"] = rank
+                writer.write(chunk[select_columns(chunk.columns, output_columns)])
+
+        del scores, distinct, runs
+
+    return rows
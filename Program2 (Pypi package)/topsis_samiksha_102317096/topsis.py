@@ -1,103 +1,336 @@
-import pandas as pd
 import numpy as np
+import argparse
+import re
 import sys
-import os
 
-def validate_input(input_file, weights, impacts):
-    if not os.path.exists(input_file):
-        print("Error: Input file not found")
-        sys.exit(1)
+from .engine import (
+    topsis_scores, dense_rank, apply_topsis_batch, select_top_k,
+    grouped_topsis_scores, grouped_dense_rank,
+)
+from .readers import input_format, MissingDependencyError
+from .validation import load_input, check_criteria, TopsisInputError
+from .profiling import stage
+
+_IMPACTS_PATTERN = re.compile(r'^[+-](,[+-])*$')
+# Weight lists such as "-1,1" or "-.5,2": a dash followed by a number
+_NEGATIVE_NUMBER_PATTERN = re.compile(r'^-\.?\d')
+
+
+def _exit_on_error(error):
+    for message in dict.fromkeys(detail["message"] for detail in error.errors):
+        print("Error:", message)
+    sys.exit(1)
+
 
+def validate_input(input_file, weights, impacts, columns=None, group_by=None, sheet=None):
     try:
-        dataframe = pd.read_csv(input_file)
-    except:
-        print("Error: Cannot read input file")
-        sys.exit(1)
+        return load_input(input_file, weights, impacts, columns, group_by, sheet)
+    except TopsisInputError as error:
+        _exit_on_error(error)
 
-    if dataframe.shape[1] < 3:
-        print("Error: Input file must contain at least 3 columns")
-        sys.exit(1)
 
+def validate_criteria(weights, impacts, criteria_count):
     try:
-        decision_matrix = dataframe.iloc[:, 1:].astype(float)
-    except:
-        print("Error: From 2nd column onward, values must be numeric")
-        sys.exit(1)
+        return check_criteria(weights, impacts, criteria_count)
+    except TopsisInputError as error:
+        _exit_on_error(error)
+
+
+def apply_topsis(dataframe, decision_matrix, weights, impacts, dtype=np.float64, top_k=None,
+                 n_jobs=1, group_by=None):
+    rows, scores = score_alternatives(dataframe, decision_matrix, weights, impacts, dtype=dtype,
+                                      top_k=top_k, n_jobs=n_jobs, group_by=group_by)
+    result = rows.copy()
+    result["Topsis Score"] = scores["Topsis Score"]
+    result["Rank"] = scores["Rank"]
+    return result
+
+
+def score_alternatives(dataframe, decision_matrix, weights, impacts, dtype=np.float64, top_k=None,
+                       n_jobs=1, group_by=None):
+    # apply_topsis without building the result frame: returns the input rows
+    # to keep (all of dataframe, or the top_k selection) and a dict of the
+    # "Topsis Score" and "Rank" arrays, ready for writers.write_result
+    if group_by is not None:
+        if top_k is not None:
+            raise ValueError("top_k cannot be combined with group_by")
+        return _score_grouped(dataframe, decision_matrix, weights, impacts, dtype, group_by)
+
+    # STEP 1-5: Scores from the NumPy engine
+    topsis_score = topsis_scores(decision_matrix, weights, impacts, dtype=dtype, n_jobs=n_jobs)
+
+    # STEP 6: Ranking
+    with stage("rank"):
+        if top_k is not None:
+            rows, rank = select_top_k(topsis_score, top_k)
+            return dataframe.iloc[rows], {"Topsis Score": topsis_score[rows], "Rank": rank}
+
+        rank = dense_rank(topsis_score)
+
+    return dataframe, {"Topsis Score": topsis_score, "Rank": rank}
 
-    weights = np.array(weights, dtype=float)
-    impacts = np.array(impacts)
 
-    if len(weights) != decision_matrix.shape[1] or len(impacts) != decision_matrix.shape[1]:
-        print("Error: Weights, impacts and criteria count must match")
+def _score_grouped(dataframe, decision_matrix, weights, impacts, dtype, group_by):
+    # Scores and ranks within each group; group_by is a column name or
+    # one label per row
+    import pandas as pd
+
+    labels = dataframe[group_by] if np.isscalar(group_by) else group_by
+    # Missing labels all get code -1, so they still form one group
+    groups, _ = pd.factorize(np.asarray(labels, dtype=object))
+
+    # STEP 1-5: Per-group scores in one segmented pass
+    topsis_score = grouped_topsis_scores(decision_matrix, weights, impacts, groups, dtype=dtype)
+
+    # STEP 6: Dense rank within each group
+    with stage("rank"):
+        rank = grouped_dense_rank(topsis_score, groups)
+
+    return dataframe, {"Topsis Score": topsis_score, "Rank": rank}
+
+
+def run_topsis(data, weights, impacts, cache=None, **options):
+    # load_input + apply_topsis in one call; with a ResultCache, repeated
+    # analyses of the same content, weights and impacts are served from it
+    if cache is not None:
+        from .cache import cached
+        return cached(cache)(run_topsis)(data, weights, impacts, **options)
+
+    dataframe, decision_matrix, weights, impacts = load_input(
+        data, weights, impacts, group_by=options.get("group_by")
+    )
+    return apply_topsis(dataframe, decision_matrix, weights, impacts, **options)
+
+
+def read_weights_file(weights_file):
+    try:
+        with open(weights_file) as handle:
+            profiles = [
+                [float(weight) for weight in line.split(',')]
+                for line in handle
+                if line.strip()
+            ]
+    except (OSError, ValueError):
+        print("Error: Cannot read weights file")
         sys.exit(1)
 
-    if not all(weights > 0):
-        print("Error: Weights must be positive")
+    if not profiles or len({len(profile) for profile in profiles}) != 1:
+        print("Error: Weights file must contain rows of equal length")
         sys.exit(1)
 
-    for impact in impacts:
-        if impact not in ['+', '-']:
-            print("Error: Impacts must be '+' or '-'")
-            sys.exit(1)
+    return np.array(profiles)
 
-    return dataframe, decision_matrix, weights, impacts
 
+def apply_topsis_profiles(dataframe, decision_matrix, weights_2d, impacts, dtype=np.float64):
+    import pandas as pd
 
-def apply_topsis(dataframe, decision_matrix, weights, impacts):
-    # STEP 1: Normalize decision matrix
-    normalized_matrix = decision_matrix / np.sqrt((decision_matrix ** 2).sum(axis=0))
+    scores = apply_topsis_batch(decision_matrix, weights_2d, impacts, dtype=dtype)
+    ranks = dense_rank(scores)
 
-    # STEP 2: Weighted normalized matrix
-    weighted_normalized_matrix = normalized_matrix * weights
+    columns = {}
+    for k in range(scores.shape[1]):
+        columns[f"Topsis Score {k + 1}"] = scores[:, k]
+        columns[f"Rank {k + 1}"] = ranks[:, k]
 
-    # STEP 3: Positive & Negative Ideal Solutions
-    positive_ideal_solution = []
-    negative_ideal_solution = []
+    return pd.concat(
+        [dataframe, pd.DataFrame(columns, index=dataframe.index)], axis=1
+    )
 
-    for i in range(len(impacts)):
-        if impacts[i] == '+':
-            positive_ideal_solution.append(weighted_normalized_matrix.iloc[:, i].max())
-            negative_ideal_solution.append(weighted_normalized_matrix.iloc[:, i].min())
-        else:
-            positive_ideal_solution.append(weighted_normalized_matrix.iloc[:, i].min())
-            negative_ideal_solution.append(weighted_normalized_matrix.iloc[:, i].max())
 
-    positive_ideal_solution = np.array(positive_ideal_solution)
-    negative_ideal_solution = np.array(negative_ideal_solution)
+class _ArgumentParser(argparse.ArgumentParser):
+    # Impact lists such as "-,+,+" and weight lists such as "-1,1" start
+    # with a dash; keep them positional so validation reports them.
+    def _parse_optional(self, arg_string):
+        if _IMPACTS_PATTERN.match(arg_string) or _NEGATIVE_NUMBER_PATTERN.match(arg_string):
+            return None
+        return super()._parse_optional(arg_string)
 
-    # STEP 4: Separation measures
-    distance_from_pis = np.sqrt(((weighted_normalized_matrix - positive_ideal_solution) ** 2).sum(axis=1))
-    distance_from_nis = np.sqrt(((weighted_normalized_matrix - negative_ideal_solution) ** 2).sum(axis=1))
 
-    # STEP 5: Relative closeness
-    topsis_score = distance_from_nis / (distance_from_pis + distance_from_nis)
+def build_parser():
+    parser = _ArgumentParser(
+        prog="topsis",
+        usage="%(prog)s [options] <inputfile> <weights> <impacts> <outputfile>\n"
+              "       %(prog)s batch --help\n"
+              "       %(prog)s serve --help",
+        description="Rank alternatives with TOPSIS.",
+    )
+    parser.add_argument("arguments", nargs="*", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--weights-file",
+        help="score one weight profile per line of this file; "
+             "<weights> is then omitted from the arguments",
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="score the file in chunks with bounded memory (CSV input only)",
+    )
+    parser.add_argument(
+        "--chunksize", type=int,
+        help="rows per chunk in streaming mode (implies --stream)",
+    )
+    parser.add_argument(
+        "--top", type=int, metavar="K",
+        help="write only the K best alternatives (ties with the K-th are kept)",
+    )
+    parser.add_argument(
+        "--n-jobs", type=int, default=1, metavar="N",
+        help="threads for the distance step (-1 = all cores)",
+    )
+    parser.add_argument(
+        "--sensitivity", type=int, metavar="DRAWS",
+        help="add rank-stability columns from DRAWS randomly perturbed weight vectors",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.1,
+        help="relative weight perturbation for --sensitivity (default: 0.1)",
+    )
+    parser.add_argument(
+        "--perturbation", choices=["uniform", "dirichlet"], default="uniform",
+        help="how --sensitivity perturbs the weights (default: uniform)",
+    )
+    parser.add_argument("--seed", type=int, help="random seed for --sensitivity")
+    parser.add_argument(
+        "--columns",
+        help="comma-separated columns to read: the name column, then the criteria",
+    )
+    parser.add_argument("--sheet", help="worksheet to read from an .xlsx input (default: the first)")
+    parser.add_argument(
+        "--group-by", metavar="COLUMN",
+        help="rank alternatives separately within each value of this column",
+    )
+    parser.add_argument(
+        "--output-columns", metavar="COLUMNS",
+        help="comma-separated columns to write: names, or id, score and rank (default: all)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="print the time and memory allocated by each pipeline stage",
+    )
+    return parser
 
-    # STEP 6: Ranking
-    rank = topsis_score.rank(ascending=False, method='dense').astype(int)
 
-    result = dataframe.copy()
-    result["Topsis Score"] = topsis_score
-    result["Rank"] = rank
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
 
-    return result
+    if argv[:1] == ["batch"]:
+        from .batch import main as batch_main
+        return batch_main(argv[1:])
+
+    if argv[:1] == ["serve"]:
+        from .serve import main as serve_main
+        return serve_main(argv[1:])
+
+    args = build_parser().parse_intermixed_args(argv)
 
+    if args.profile:
+        from .profiling import record_stages
+        with record_stages(memory=True) as recorder:
+            _run(args)
+        print(recorder.report())
+        return
 
-def main():
-    if len(sys.argv) != 5:
+    _run(args)
+
+
+def _run(args):
+    expected = 3 if args.weights_file else 4
+
+    if len(args.arguments) != expected:
         print("Usage: python <program.py> <inputfile> <weights> <impacts> <outputfile>")
         sys.exit(1)
 
-    input_file = sys.argv[1]
-    weights = sys.argv[2].split(',')
-    impacts = sys.argv[3].split(',')
-    output_file = sys.argv[4]
+    if args.weights_file:
+        input_file, impacts, output_file = args.arguments
+        weights_2d = read_weights_file(args.weights_file)
+        weights = weights_2d[0]
+    else:
+        input_file, weights, impacts, output_file = args.arguments
+        weights = weights.split(',')
+    impacts = impacts.split(',')
+    columns = args.columns.split(',') if args.columns else None
+    output_columns = args.output_columns.split(',') if args.output_columns else None
+
+    from .writers import output_format, check_output, write_result
+    try:
+        check_output(output_file)
+    except MissingDependencyError as error:
+        print("Error:", error)
+        sys.exit(1)
+
+    if args.top is not None and args.top <= 0:
+        print("Error: --top must be a positive integer")
+        sys.exit(1)
+
+    if args.group_by and (args.weights_file or args.top or args.sensitivity):
+        print("Error: --weights-file, --top and --sensitivity cannot be combined with --group-by")
+        sys.exit(1)
+
+    if args.stream or args.chunksize:
+        if args.weights_file or columns or args.top or args.sensitivity or args.group_by:
+            print("Error: --weights-file, --columns, --top, --sensitivity and --group-by "
+                  "cannot be combined with --stream")
+            sys.exit(1)
+        if input_format(input_file) != 'csv':
+            print("Error: --stream supports CSV input only")
+            sys.exit(1)
+        from .stream import topsis_stream, DEFAULT_CHUNKSIZE
+        try:
+            topsis_stream(input_file, weights, impacts, output_file,
+                          chunksize=args.chunksize or DEFAULT_CHUNKSIZE, output_columns=output_columns)
+        except ValueError as error:
+            print("Error:", error)
+            sys.exit(1)
+        print("TOPSIS result saved to", output_file)
+        return
+
+    # Plain CSV runs are parsed with the csv module and never import pandas
+    plain = not (args.weights_file or args.sensitivity or columns or args.group_by or output_columns)
+    if plain and input_format(input_file) == 'csv' and output_format(output_file) == ('csv', None):
+        from .fastpath import topsis_csv
+        if topsis_csv(input_file, weights, impacts, output_file, top_k=args.top, n_jobs=args.n_jobs):
+            print("TOPSIS result saved to", output_file)
+            return
 
     dataframe, decision_matrix, weights, impacts = validate_input(
-        input_file, weights, impacts
+        input_file, weights, impacts, columns, args.group_by, args.sheet
     )
+    scores = None
 
-    result = apply_topsis(dataframe, decision_matrix, weights, impacts)
-    result.to_csv(output_file, index=False)
+    if args.weights_file:
+        if args.top or args.sensitivity:
+            print("Error: --top and --sensitivity cannot be combined with --weights-file")
+            sys.exit(1)
+        if not (weights_2d > 0).all():
+            print("Error: Weights must be positive")
+            sys.exit(1)
+        result = apply_topsis_profiles(dataframe, decision_matrix, weights_2d, impacts)
+    elif args.sensitivity:
+        if args.top:
+            print("Error: --top cannot be combined with --sensitivity")
+            sys.exit(1)
+        import pandas as pd
+        from .sensitivity import weight_sensitivity
+        try:
+            stability = weight_sensitivity(
+                decision_matrix, weights, impacts, draws=args.sensitivity,
+                jitter=args.jitter, method=args.perturbation, seed=args.seed, n_jobs=args.n_jobs,
+            )
+        except ValueError as error:
+            print("Error:", error)
+            sys.exit(1)
+        result = apply_topsis(dataframe, decision_matrix, weights, impacts, n_jobs=args.n_jobs)
+        stability.index = result.index
+        result = pd.concat([result, stability.drop(columns="Rank")], axis=1)
+    else:
+        # Scores and ranks are written next to the input rows chunk by chunk
+        result, scores = score_alternatives(dataframe, decision_matrix, weights, impacts,
+                                            top_k=args.top, n_jobs=args.n_jobs, group_by=args.group_by)
+    with stage("write"):
+        try:
+            write_result(result, output_file, output_columns, scores)
+        except ValueError as error:
+            print("Error:", error)
+            sys.exit(1)
 
     print("TOPSIS result saved to", output_file)
-
@@ -0,0 +1,169 @@
+import io
+import os
+
+import numpy as np
+
+from .readers import read_table, read_xlsx, numeric_block, frame_from_matrix, MissingDependencyError, ZIP_MAGIC
+from .profiling import stage
+
+
+class TopsisInputError(ValueError):
+    """Invalid TOPSIS input.
+
+    ``errors`` lists every problem found as a dict with a ``code``, a
+    human-readable ``message`` and code-specific details (for example the
+    offending ``column``), so callers can present them in their own words.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(error["message"] for error in errors))
+
+
+def _error(code, message, **details):
+    return dict(code=code, message=message, **details)
+
+
+def _is_workbook(handle):
+    # Uploaded .xlsx workbooks are recognised by their zip signature
+    try:
+        position = handle.tell()
+        signature = handle.read(len(ZIP_MAGIC))
+        handle.seek(position)
+    except (AttributeError, OSError):
+        return False
+    return signature == ZIP_MAGIC
+
+
+def _read(data, columns, sheet=None):
+    import pandas as pd
+
+    if isinstance(data, pd.DataFrame):
+        dataframe = data if columns is None else data[list(columns)]
+        return dataframe, None
+    if isinstance(data, np.ndarray):
+        return frame_from_matrix(data, columns)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = io.BytesIO(data)
+    if hasattr(data, 'read'):
+        if _is_workbook(data):
+            return read_xlsx(data, columns, sheet)
+        dataframe = pd.read_csv(data, usecols=columns)
+        return (dataframe if columns is None else dataframe[list(columns)]), None
+
+    if not os.path.exists(data):
+        raise TopsisInputError([_error("file_not_found", "Input file not found")])
+    return read_table(data, columns, sheet)
+
+
+def check_criteria(weights, impacts, criteria_count):
+    """Validate weights and impacts; return them as arrays or raise TopsisInputError."""
+    errors = []
+    weight_count = len(weights)
+
+    try:
+        weights = np.array(weights, dtype=float)
+    except (TypeError, ValueError):
+        errors.append(_error("non_numeric_weights", "Weights must be numeric"))
+        weights = None
+    impacts = np.array(impacts)
+
+    if weight_count != criteria_count or len(impacts) != criteria_count:
+        errors.append(_error(
+            "count_mismatch", "Weights, impacts and criteria count must match",
+            criteria=criteria_count, weights=weight_count, impacts=len(impacts),
+        ))
+
+    if weights is not None and not all(weights > 0):
+        errors.append(_error("non_positive_weights", "Weights must be positive"))
+    elif weights is not None and not np.isfinite(weights).all():
+        errors.append(_error("non_finite_weights", "Weights must be finite"))
+
+    invalid = [str(impact) for impact in impacts if impact not in ['+', '-']]
+    if invalid:
+        errors.append(_error("invalid_impacts", "Impacts must be '+' or '-'", values=invalid))
+
+    if errors:
+        raise TopsisInputError(errors)
+    return weights, impacts
+
+
+def load_input(data, weights, impacts, columns=None, group_by=None, sheet=None):
+    """Parse and validate TOPSIS input in one pass, raising instead of exiting.
+
+    ``data`` may be a path, a DataFrame, a 2-D numeric ndarray, CSV bytes or
+    a binary file-like object. Returns ``(dataframe, decision_matrix,
+    weights, impacts)`` like ``validate_input``; on bad input raises
+    ``TopsisInputError`` carrying every problem found. A ``group_by``
+    column stays in the dataframe but is not a criterion. ``sheet`` picks
+    the worksheet of an .xlsx input (path or bytes).
+    """
+    if columns is not None and group_by is not None and group_by not in columns:
+        columns = [*columns, group_by]
+
+    try:
+        with stage("parse"):
+            dataframe, decision_matrix = _read(data, columns, sheet)
+    except TopsisInputError:
+        raise
+    except MissingDependencyError as error:
+        raise TopsisInputError([_error("missing_dependency", str(error))])
+    except Exception as error:
+        raise TopsisInputError([_error("unreadable", "Cannot read input file", detail=str(error))])
+
+    with stage("validate"):
+        return _validate(dataframe, decision_matrix, weights, impacts, group_by)
+
+
+def _validate(dataframe, decision_matrix, weights, impacts, group_by=None):
+    criteria_frame = dataframe
+    if group_by is not None:
+        if group_by not in dataframe.columns[1:]:
+            raise TopsisInputError([_error(
+                "invalid_group_by", "Group column must be one of the columns after the first",
+                column=group_by,
+            )])
+        criteria_frame = dataframe.drop(columns=group_by)
+        decision_matrix = None
+
+    if criteria_frame.shape[1] < 3:
+        raise TopsisInputError([_error(
+            "too_few_columns", "Input file must contain at least 3 columns",
+            found=dataframe.shape[1],
+        )])
+
+    errors = []
+    if len(dataframe) == 0:
+        errors.append(_error("empty", "Input file has no data rows"))
+
+    if decision_matrix is None:
+        try:
+            decision_matrix = numeric_block(criteria_frame)
+        except (TypeError, ValueError):
+            decision_matrix = None
+            for column in criteria_frame.columns[1:]:
+                try:
+                    criteria_frame[column].astype(float)
+                except (TypeError, ValueError):
+                    errors.append(_error(
+                        "non_numeric", "From 2nd column onward, values must be numeric",
+                        column=column,
+                    ))
+
+    if decision_matrix is not None:
+        # Empty cells parse as NaN, and a NaN would make every score NaN
+        missing = np.isnan(np.asarray(decision_matrix, dtype=float)).any(axis=0)
+        for column in criteria_frame.columns[1:][missing]:
+            errors.append(_error(
+                "missing_values", "Input file contains missing values", column=column,
+            ))
+
+    criteria_count = criteria_frame.shape[1] - 1
+    try:
+        weights, impacts = check_criteria(weights, impacts, criteria_count)
+    except TopsisInputError as error:
+        errors.extend(error.errors)
+
+    if errors:
+        raise TopsisInputError(errors)
+    return dataframe, decision_matrix, weights, impacts
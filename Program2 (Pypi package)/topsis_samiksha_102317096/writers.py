@@ -0,0 +1,179 @@
+"""Result writers: CSV (plain, gzip or zstd), Parquet, Feather and .npy.
+
+The format follows the output file's extension, as ``input_format`` does
+for inputs: ``.csv.gz`` and ``.csv.zst`` are compressed CSV, ``.parquet``
+/ ``.pq`` and ``.feather`` / ``.arrow`` / ``.ipc`` go through pyarrow, and
+``.npy`` holds the numeric result columns as one float64 matrix (row ``i``
+is input row ``i``). Results are written ``chunksize`` rows at a time, so
+the full result frame (a copy of the input plus scores) is never built.
+"""
+import gzip
+import io
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from .readers import (
+    NPY_EXTENSIONS, PARQUET_EXTENSIONS, FEATHER_EXTENSIONS, MissingDependencyError, _pyarrow,
+)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+# Short names accepted by --output-columns; "id" is the first input column
+COLUMN_ALIASES = {'score': 'Topsis Score', 'rank': 'Rank'}
+
+
+def output_format(output_file):
+    """``(format, compression)`` for an output path, e.g. ``('csv', 'gzip')``."""
+    extension = os.path.splitext(str(output_file))[1].lower()
+    if extension in COMPRESSION_EXTENSIONS:
+        return 'csv', COMPRESSION_EXTENSIONS[extension]
+    if extension in NPY_EXTENSIONS:
+        return 'npy', None
+    if extension in PARQUET_EXTENSIONS:
+        return 'parquet', None
+    if extension in FEATHER_EXTENSIONS:
+        return 'feather', None
+    return 'csv', None
+
+
+def _zstd_open(output_file):
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd.open(output_file, 'wb')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise MissingDependencyError(
+            "Writing .zst files requires zstandard (pip install zstandard)"
+        )
+    return zstandard.open(output_file, 'wb')
+
+
+def check_output(output_file):
+    """Fail early, before any scoring, if the output format needs a missing package."""
+    file_format, compression = output_format(output_file)
+    if file_format in ('parquet', 'feather'):
+        _pyarrow(file_format)
+    if compression == 'zstd':
+        _zstd_open(os.devnull).close()
+
+
+def _open_text(output_file, compression):
+    if compression == 'gzip':
+        # Level 6 is zlib's default; 9 is several times slower for a few % less
+        binary = gzip.open(output_file, 'wb', compresslevel=6)
+    elif compression == 'zstd':
+        binary = _zstd_open(output_file)
+    else:
+        return open(output_file, 'w', newline='', encoding='utf-8')
+    return io.TextIOWrapper(binary, encoding='utf-8', newline='')
+
+
+def select_columns(available, requested=None):
+    """Resolve ``--output-columns``: column names, or the aliases id, score and rank."""
+    available = list(available)
+    if requested is None:
+        return available
+
+    aliases = {'id': available[0], **COLUMN_ALIASES}
+    names = [name if name in available else aliases.get(name, name)
+             for name in (name.strip() for name in requested)]
+    missing = [name for name in names if name not in available]
+    if missing:
+        raise ValueError(f"Unknown output column(s): {', '.join(missing)}")
+    return names
+
+
+class ResultWriter:
+    """Append result chunks (DataFrames with the same columns) to one file.
+
+    ``.npy`` output is preallocated, so it needs ``rows`` up front; the
+    other formats take any number of chunks.
+    """
+
+    def __init__(self, output_file, rows=None):
+        self.output_file = output_file
+        self.format, self.compression = output_format(output_file)
+        self.rows = rows
+        self.written = 0
+        self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, chunk):
+        getattr(self, f"_write_{self.format}")(chunk)
+        self.written += len(chunk)
+
+    def _write_csv(self, chunk):
+        if self._handle is None:
+            self._handle = _open_text(self.output_file, self.compression)
+        chunk.to_csv(self._handle, header=self.written == 0, index=False)
+
+    def _write_arrow(self, chunk, open_writer):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._handle is None:
+            self._handle = open_writer(table.schema)
+        else:
+            # A chunk can infer a narrower type, e.g. null for an all-missing column
+            table = table.cast(self._handle.schema)
+        self._handle.write_table(table)
+
+    def _write_parquet(self, chunk):
+        parquet = _pyarrow('parquet')
+        self._write_arrow(chunk, lambda schema: parquet.ParquetWriter(self.output_file, schema))
+
+    def _write_feather(self, chunk):
+        _pyarrow('feather')
+        import pyarrow as pa
+
+        self._write_arrow(chunk, lambda schema: pa.ipc.new_file(self.output_file, schema))
+
+    def _write_npy(self, chunk):
+        if self._handle is None:
+            if self.rows is None:
+                raise ValueError(".npy output needs the number of rows up front")
+            self._columns = list(chunk.select_dtypes('number').columns)
+            self._handle = open_memmap(self.output_file, mode='w+', dtype=np.float64,
+                                       shape=(self.rows, len(self._columns)))
+        block = chunk[self._columns].to_numpy(dtype=np.float64)
+        self._handle[self.written:self.written + len(block)] = block
+
+    def close(self):
+        if self._handle is None:
+            return
+        if self.format == 'npy':
+            self._handle.flush()
+        else:
+            self._handle.close()
+        self._handle = None
+
+
+def write_result(frame, output_file, columns=None, extra=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Write ``frame`` plus the ``extra`` columns (name -> array) to ``output_file``.
+
+    ``columns`` picks and orders the written columns (see ``select_columns``).
+    Only one chunk of the combined result exists at a time.
+    """
+    extra = extra or {}
+    names = select_columns(list(frame.columns) + list(extra), columns)
+    positions = [frame.columns.get_loc(name) for name in names if name not in extra]
+
+    with ResultWriter(output_file, rows=len(frame)) as writer:
+        for start in range(0, max(len(frame), 1), chunksize):
+            stop = start + chunksize
+            chunk = frame.iloc[start:stop, positions]
+            chunk = chunk.assign(**{name: np.asarray(values)[start:stop]
+                                    for name, values in extra.items() if name in names})
+            writer.write(chunk[names])
@@ -0,0 +1,148 @@
+"""
+Request parsing and streamed output for the /api/topsis endpoint
+
+A request body holds one or more independent matrices:
+
+- text/csv: one CSV table per matrix, separated by an empty line
+- an .xlsx workbook: one matrix from its first (or ?sheet=) worksheet
+- application/x-ndjson: one JSON matrix object per line
+- application/json: a list of rows, or an object with "rows" (one matrix)
+  or "matrices" (a list of matrix objects)
+
+A matrix object has "rows" (lists or objects), and optionally "id",
+"columns" (names for list rows), "weights" and "impacts". Weights and
+impacts default to the top-level JSON fields, then the query string.
+"""
+import json
+import re
+
+import pandas as pd
+
+from topsis_samiksha_102317096 import load_input, apply_topsis, TopsisInputError
+
+CSV_TYPES = ('text/csv',)
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/ndjson')
+JSON_TYPES = ('application/json',)
+XLSX_TYPES = ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',)
+
+OUTPUT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+_BLANK_LINE = re.compile(rb'\r?\n[ \t]*\r?\n')
+
+
+class ApiError(Exception):
+    """Bad request; ``errors`` follows the TopsisInputError format"""
+
+    def __init__(self, errors, status=400):
+        self.errors = errors
+        self.status = status
+        super().__init__("; ".join(error['message'] for error in errors))
+
+
+def _split_list(value):
+    if value is None or isinstance(value, list):
+        return value
+    return [item.strip() for item in str(value).split(',')]
+
+
+def _frame(matrix, position):
+    rows = matrix.get('rows')
+    if not isinstance(rows, list) or not rows:
+        raise ApiError([{'code': 'empty', 'message': "Matrix needs a non-empty 'rows' list", 'matrix': position}])
+
+    try:
+        if isinstance(rows[0], dict):
+            return pd.DataFrame.from_records(rows)
+        width = len(rows[0])
+        columns = matrix.get('columns') or ['Alternative'] + [f'C{j}' for j in range(1, width)]
+        return pd.DataFrame.from_records(rows, columns=columns)
+    except (TypeError, ValueError) as error:
+        # Ragged rows, or rows that are not lists or objects
+        raise ApiError([{'code': 'unreadable', 'message': 'Cannot read matrix rows',
+                         'detail': str(error), 'matrix': position}])
+
+
+def parse_matrices(body, mimetype, weights=None, impacts=None):
+    """
+    Split a request body into (id, data, weights, impacts) tuples
+    data is CSV bytes or a DataFrame, ready for load_input
+    """
+    weights, impacts = _split_list(weights), _split_list(impacts)
+
+    if mimetype in CSV_TYPES:
+        tables = [table for table in _BLANK_LINE.split(body.strip()) if table.strip()]
+        return [(position, table, weights, impacts) for position, table in enumerate(tables)]
+    if mimetype in XLSX_TYPES:
+        return [(0, body, weights, impacts)] if body else []
+
+    try:
+        if mimetype in NDJSON_TYPES:
+            matrices = [json.loads(line) for line in body.splitlines() if line.strip()]
+        elif mimetype in JSON_TYPES:
+            payload = json.loads(body)
+            if isinstance(payload, list):
+                payload = {'rows': payload}
+            weights = _split_list(payload.get('weights', weights))
+            impacts = _split_list(payload.get('impacts', impacts))
+            matrices = payload['matrices'] if 'matrices' in payload else [payload]
+        else:
+            raise ApiError([{'code': 'unsupported_media_type',
+                             'message': 'Send text/csv, application/x-ndjson, application/json or an .xlsx workbook'}],
+                           status=415)
+    except (ValueError, AttributeError, KeyError) as error:
+        raise ApiError([{'code': 'unreadable', 'message': 'Request body is not valid JSON', 'detail': str(error)}])
+
+    parsed = []
+    for position, matrix in enumerate(matrices):
+        if not isinstance(matrix, dict):
+            raise ApiError([{'code': 'unreadable', 'message': 'Each matrix must be a JSON object', 'matrix': position}])
+        parsed.append((
+            matrix.get('id', position),
+            _frame(matrix, matrix.get('id', position)),
+            _split_list(matrix.get('weights', weights)),
+            _split_list(matrix.get('impacts', impacts)),
+        ))
+    return parsed
+
+
+def validate_matrices(matrices, sheet=None):
+    """
+    Parse and validate every matrix up front, so a bad one is reported
+    with a 400 before any output is streamed
+    """
+    validated, errors = [], []
+    for matrix_id, data, weights, impacts in matrices:
+        if weights is None or impacts is None:
+            errors.append({'code': 'missing_criteria', 'message': 'Weights and impacts are required', 'matrix': matrix_id})
+            continue
+        try:
+            validated.append((matrix_id, *load_input(data, weights, impacts, sheet=sheet)))
+        except TopsisInputError as error:
+            errors.extend({**detail, 'matrix': matrix_id} for detail in error.errors)
+
+    if errors:
+        raise ApiError(errors)
+    return validated
+
+
+def _results(validated):
+    for matrix_id, dataframe, decision_matrix, weights, impacts in validated:
+        yield matrix_id, apply_topsis(dataframe, decision_matrix, weights, impacts)
+
+
+def stream_csv(validated, chunk_rows=10000):
+    """Yield results as CSV, one table per matrix separated by an empty line"""
+    for position, (_, result) in enumerate(_results(validated)):
+        if position:
+            yield '\n'
+        for start in range(0, len(result), chunk_rows):
+            yield result.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0)
+
+
+def stream_ndjson(validated, chunk_rows=10000):
+    """Yield results as NDJSON, one {"matrix": id, "row": {...}} line per alternative"""
+    for matrix_id, result in _results(validated):
+        prefix = f'{{"matrix": {json.dumps(matrix_id)}, "row": '
+        for start in range(0, len(result), chunk_rows):
+            lines = result.iloc[start:start + chunk_rows].to_json(orient='records', lines=True, double_precision=15)
+            yield ''.join(f'{prefix}{line}}}\n' for line in lines.splitlines())
@@ -1,48 +1,162 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response, g
 import os
-import tempfile
 import time
-import pandas as pd
-from topsis_samiksha_102317096 import validate_input, apply_topsis
+import uuid
+import zlib
+from contextlib import ExitStack
+from topsis_samiksha_102317096 import (
+    load_input, apply_topsis, TopsisInputError, ResultCache, cached, record_stages, PreparedMatrix,
+)
+from topsis_samiksha_102317096.profiling import stage
+from topsis_samiksha_102317096.writers import select_columns
+from jobs import JobQueue, PermanentDeliveryError
+from results_store import ResultStore
+from metrics import Registry, CONTENT_TYPE
+from uploads import GuardedRequest, UploadRejected, UploadTooLarge
+from werkzeug.exceptions import RequestEntityTooLarge
+import api
 
 # Email imports
-import smtplib
 from email.message import EmailMessage
+from mailer import Mailer
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-this-random-string-for-production')
 
-# Use /tmp for serverless (Vercel doesn't allow writing to other directories)
-UPLOAD_FOLDER = "/tmp/uploads"
-RESULT_FOLDER = "/tmp/results"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(RESULT_FOLDER, exist_ok=True)
+# Uploads are validated while they stream in (see uploads.py) and capped in
+# size, rows and columns; oversized or malformed files are rejected early
+app.request_class = GuardedRequest
+app.config['MAX_CONTENT_LENGTH'] = int(float(os.getenv('MAX_UPLOAD_MB', 16)) * 2 ** 20)
+app.config['MAX_UPLOAD_ROWS'] = int(os.getenv('MAX_UPLOAD_ROWS', 1_000_000))
+app.config['MAX_UPLOAD_COLUMNS'] = int(os.getenv('MAX_UPLOAD_COLUMNS', 1000))
 
-def send_email(receiver_email, attachment_path):
+# SMTP server (defaults to Gmail over SSL; point at a local stand-in for testing)
+SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', 465))
+SMTP_USE_SSL = os.getenv('SMTP_USE_SSL', '1') == '1'
+
+# Result emails go through a small pool of kept-alive SMTP connections
+mailer = Mailer(
+    SMTP_HOST, SMTP_PORT, use_ssl=SMTP_USE_SSL,
+    username=os.getenv('SENDER_EMAIL'), password=os.getenv('APP_PASSWORD'),
+    connections=int(os.getenv('SMTP_CONNECTIONS', 2)),
+    max_per_connection=int(os.getenv('SMTP_MAX_PER_CONNECTION', 100)),
+    idle_timeout=float(os.getenv('SMTP_IDLE_TIMEOUT', 30)),
+    attempts=int(os.getenv('EMAIL_ATTEMPTS', 3)),
+    backoff=float(os.getenv('EMAIL_BACKOFF', 2.0)),
+)
+# Attachments larger than this are sent gzipped
+EMAIL_GZIP_BYTES = int(os.getenv('EMAIL_GZIP_BYTES', 2 ** 20))
+
+# Repeated analyses (same file content, weights and impacts) are served from
+# this cache; set RESULT_CACHE_DIR (e.g. /tmp/topsis-cache) to add a disk tier
+result_cache = ResultCache(
+    max_entries=int(os.getenv('RESULT_CACHE_ENTRIES', 128)),
+    max_bytes=int(os.getenv('RESULT_CACHE_BYTES', 256 * 2 ** 20)),
+    ttl=int(os.getenv('RESULT_CACHE_TTL', 3600)),
+    disk_dir=os.getenv('RESULT_CACHE_DIR'),
+)
+
+# The last analysed matrix of each browser session, prepared for /rescore
+datasets = ResultCache(
+    max_entries=int(os.getenv('DATASET_ENTRIES', 32)),
+    max_bytes=int(os.getenv('DATASET_BYTES', 512 * 2 ** 20)),
+    ttl=int(os.getenv('DATASET_TTL', 1800)),
+)
+
+# Results are kept server-side and served page by page
+result_store = ResultStore(
+    root=os.getenv('RESULT_STORE_DIR', '/tmp/topsis-results'),
+    ttl=int(os.getenv('RESULT_STORE_TTL', 3600)),
+)
+MAX_PAGE_SIZE = 500
+
+# Analyses run in the background; the POST handler only queues them
+job_queue = JobQueue(
+    workers=int(os.getenv('JOB_WORKERS', 2)),
+    email_attempts=int(os.getenv('EMAIL_ATTEMPTS', 3)),
+    email_backoff=float(os.getenv('EMAIL_BACKOFF', 2.0)),
+)
+
+# Prometheus histograms served by /metrics
+metrics = Registry()
+request_duration = metrics.histogram(
+    'topsis_request_duration_seconds', 'Time to produce a response (streamed bodies excluded)',
+    ['method', 'endpoint', 'status'],
+)
+stage_duration = metrics.histogram(
+    'topsis_stage_duration_seconds', 'Time spent in each TOPSIS pipeline stage', ['stage'],
+)
+
+def observe_stage(name, seconds, allocated_bytes):
+    stage_duration.observe(seconds, name)
+
+@app.before_request
+def start_timing():
+    """Record the pipeline stages run while handling this request"""
+    g.request_start = time.perf_counter()
+    g.stage_scope = ExitStack()
+    g.stage_recorder = g.stage_scope.enter_context(record_stages(callback=observe_stage))
+
+@app.after_request
+def add_server_timing(response):
+    """Server-Timing header with the stage totals, plus the request histogram"""
+    elapsed = time.perf_counter() - g.request_start
+    timings = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in g.stage_recorder.totals().items()]
+    timings.append(f"app;dur={elapsed * 1000:.2f}")
+    response.headers['Server-Timing'] = ", ".join(timings)
+    request_duration.observe(elapsed, request.method, request.endpoint or 'unmatched', str(response.status_code))
+    return response
+
+@app.teardown_request
+def stop_timing(exception=None):
+    scope = g.pop('stage_scope', None)
+    if scope is not None:
+        scope.close()
+
+def result_attachment(result_id):
     """
-    Send email with TOPSIS result attached
-    Uses environment variables for credentials
+    Render a stored result as the email attachment, chunk by chunk
+    Results above EMAIL_GZIP_BYTES are gzipped; returns (data, subtype, filename)
     """
-    try:
-        sender_email = os.getenv('SENDER_EMAIL')
-        app_password = os.getenv('APP_PASSWORD')
-        
-        if not sender_email or not app_password:
-            print("Error: Email credentials not found in environment variables")
-            print("Please set SENDER_EMAIL and APP_PASSWORD in your .env file")
-            return False
-        
-        msg = EmailMessage()
-        msg['Subject'] = 'TOPSIS Analysis Result - Your Multi-Criteria Decision Analysis'
-        msg['From'] = sender_email
-        msg['To'] = receiver_email
-        
-        # Email body
-        email_body = """Dear User,
+    chunks, size = [], 0
+    compressor = None
+    for chunk in result_store.iter_csv(result_id):
+        data = chunk.encode()
+        if compressor is None and size + len(data) > EMAIL_GZIP_BYTES:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            chunks = [compressor.compress(b"".join(chunks))]
+        chunks.append(compressor.compress(data) if compressor else data)
+        size += len(data)
+    if compressor is None:
+        return b"".join(chunks), 'csv', 'topsis_result.csv'
+    chunks.append(compressor.flush())
+    return b"".join(chunks), 'gzip', 'topsis_result.csv.gz'
+
+def send_email(receiver_email, result_id):
+    """
+    Queue the email with the TOPSIS result attached on the pooled mailer
+    Returns the mailer's Delivery; raises PermanentDeliveryError if credentials are missing
+    """
+    sender_email = os.getenv('SENDER_EMAIL')
+
+    # A password is only optional for a plain (non-SSL) local SMTP server
+    if not sender_email or (SMTP_USE_SSL and not mailer.password):
+        print("Error: Email credentials not found in environment variables")
+        print("Please set SENDER_EMAIL and APP_PASSWORD in your .env file")
+        raise PermanentDeliveryError("Email is not configured on this server")
+
+    msg = EmailMessage()
+    msg['Subject'] = 'TOPSIS Analysis Result - Your Multi-Criteria Decision Analysis'
+    msg['From'] = sender_email
+    msg['To'] = receiver_email
+
+    # Email body
+    email_body = """Dear User,
 
 Your TOPSIS (Technique for Order of Preference by Similarity to Ideal Solution) analysis has been completed successfully!
 
-The attached CSV file contains:
+The attached CSV file (gzip-compressed for large results) contains:
 - Original data
 - Calculated TOPSIS scores
 - Final rankings of alternatives
@@ -61,83 +175,131 @@ TOPSIS Web Service Team
 Powered by topsis-samiksha-102317096
 Visit: https://pypi.org/project/topsis-samiksha-102317096/
 """
-        
-        msg.set_content(email_body)
-        
-        # Attach the result file
-        with open(attachment_path, 'rb') as f:
-            file_data = f.read()
-            file_name = os.path.basename(attachment_path)
-        
-        msg.add_attachment(file_data, maintype='application', subtype='csv', filename=file_name)
-        
-        # Send email via Gmail SMTP
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(sender_email, app_password)
-            smtp.send_message(msg)
-        
-        print(f"✅ Email sent successfully to {receiver_email}")
-        return True
-        
-    except smtplib.SMTPAuthenticationError:
-        print("❌ Email authentication failed. Please check your SENDER_EMAIL and APP_PASSWORD")
-        return False
-    except smtplib.SMTPException as e:
-        print(f"❌ SMTP error occurred: {e}")
-        return False
-    except Exception as e:
-        print(f"❌ Email error: {e}")
-        return False
 
-def validate_csv_structure(file_path):
+    msg.set_content(email_body)
+
+    # Attach the result, rendered from the result store
+    attachment_data, subtype, attachment_name = result_attachment(result_id)
+    msg.add_attachment(attachment_data, maintype='application', subtype=subtype, filename=attachment_name)
+
+    delivery = mailer.send(msg)
+    delivery.add_done_callback(lambda done: print(
+        f"✅ Email sent successfully to {receiver_email}" if done.exception() is None
+        else f"❌ Email to {receiver_email} failed: {done.exception()}"
+    ))
+    return delivery
+
+def describe_input_error(error, weights, impacts):
+    """
+    Turn the structured errors of TopsisInputError into user-facing messages
+    """
+    messages = []
+    for detail in error.errors:
+        code = detail["code"]
+        if code == "too_few_columns":
+            messages.append(f"CSV file must contain at least 3 columns (1 name + 2 criteria). Found {detail['found']} columns.")
+        elif code == "empty":
+            messages.append("CSV file is empty. Please provide data rows.")
+        elif code == "non_numeric":
+            messages.append(f"Column '{detail['column']}' contains non-numeric values. All criteria columns must have numeric values only.")
+        elif code == "missing_values":
+            messages.append(f"Column '{detail['column']}' has empty cells. Every alternative needs a value for every criterion.")
+        elif code == "count_mismatch":
+            messages.append(
+                f"❌ Count mismatch: CSV file has {detail['criteria']} criteria columns, but you provided "
+                f"{len(weights)} weights and {len(impacts)} impacts. All counts must match."
+            )
+        elif code == "unreadable":
+            messages.append("Unable to parse the uploaded file. Please check that it is a valid CSV or .xlsx file.")
+        else:
+            messages.append(f"❌ TOPSIS validation error: {detail['message']}")
+    return " ".join(messages)
+
+def check_upload_limits(decision_matrix):
     """
-    Validate CSV file structure before processing
-    Returns: (is_valid, error_message, column_count)
+    Row and column caps for inputs that could not be checked while streaming
+    (Excel workbooks, API bodies); raises UploadTooLarge with the message
     """
+    rows, criteria = decision_matrix.shape
+    if rows > app.config['MAX_UPLOAD_ROWS']:
+        raise UploadTooLarge(f"❌ Too many rows: {rows} (the limit is {app.config['MAX_UPLOAD_ROWS']}).")
+    if criteria + 1 > app.config['MAX_UPLOAD_COLUMNS']:
+        raise UploadTooLarge(f"❌ Too many columns: {criteria + 1} (the limit is {app.config['MAX_UPLOAD_COLUMNS']}).")
+
+def upload_too_large_message():
+    return f"❌ File is too large. The limit is {app.config['MAX_CONTENT_LENGTH'] / 2 ** 20:g} MB."
+
+@cached(result_cache)
+def run_analysis(upload, weights, impacts):
+    """
+    Parse, validate and score one upload (runs on the job queue)
+    Returns the result frame
+    """
+    # One parse of the upload checks structure, numeric columns and the
+    # criteria count against the weights and impacts
     try:
-        # Read CSV
-        df = pd.read_csv(file_path)
-        
-        # Check if file has at least 3 columns
-        if len(df.columns) < 3:
-            return False, f"CSV file must contain at least 3 columns (1 name + 2 criteria). Found {len(df.columns)} columns.", 0
-        
-        # Check if file has at least one row
-        if len(df) == 0:
-            return False, "CSV file is empty. Please provide data rows.", 0
-        
-        # Number of criteria columns (excluding first column which is name/alternative)
-        criteria_count = len(df.columns) - 1
-        
-        # Check if columns 2 to last contain numeric values
-        numeric_columns = df.columns[1:]
-        for col in numeric_columns:
-            # Try to convert to numeric
-            try:
-                pd.to_numeric(df[col], errors='raise')
-            except (ValueError, TypeError):
-                return False, f"Column '{col}' contains non-numeric values. All criteria columns must have numeric values only.", 0
-        
-        return True, None, criteria_count
-        
-    except pd.errors.EmptyDataError:
-        return False, "CSV file is empty or invalid.", 0
-    except pd.errors.ParserError:
-        return False, "Unable to parse CSV file. Please check the file format.", 0
+        dataframe, decision_matrix, validated_weights, validated_impacts = load_input(
+            upload, weights, impacts
+        )
+    except TopsisInputError as input_error:
+        raise ValueError(describe_input_error(input_error, weights, impacts))
+    check_upload_limits(decision_matrix)
+
+    print(f"✅ All validations passed. Processing TOPSIS...")
+    print(f"   - Criteria columns: {decision_matrix.shape[1]}")
+    print(f"   - Weights: {weights}")
+    print(f"   - Impacts: {impacts}")
+
+    try:
+        result = apply_topsis(dataframe, decision_matrix, validated_weights, validated_impacts)
     except Exception as e:
-        return False, f"Error reading CSV file: {str(e)}", 0
+        raise ValueError(f"❌ Error applying TOPSIS algorithm: {str(e)}")
+
+    print(f"✅ TOPSIS result ready ({len(result)} rows)")
+    return {
+        'frame': result,
+    }
+
+def prepare_dataset(frame):
+    """
+    Normalize the criteria of a result once, so /rescore only re-weights
+    The frame is the input columns plus Topsis Score and Rank
+    """
+    criteria = frame.iloc[:, 1:-2]
+    return {
+        'prepared': PreparedMatrix(criteria.to_numpy(dtype=float)),
+        'name': str(frame.columns[0]),
+        'labels': frame.iloc[:, 0].to_numpy(),
+        'criteria': [str(column) for column in criteria.columns],
+    }
+
+def publish_analysis(upload, weights, impacts, dataset_id=None):
+    """
+    Run (or reuse) an analysis and put its result in the result store
+    The job keeps only the result ID; pages are read from the store
+    With a dataset_id the matrix is also kept for /rescore
+    """
+    with record_stages(callback=observe_stage) as recorder:
+        analysis = run_analysis(upload, weights, impacts)
+        with stage("write"):
+            result_id = result_store.save(analysis['frame'])
+        if dataset_id is not None:
+            with stage("normalize"):
+                datasets.put(dataset_id, prepare_dataset(analysis['frame']))
+    return {
+        'result_id': result_id,
+        'rows': len(analysis['frame']),
+        'timings': recorder.totals(),
+    }
 
 @app.route("/", methods=["GET", "POST"])
 def index():
     # Get flash messages if any
     toast = session.pop('toast', False)
     error = session.pop('error', None)
-    results = session.pop('results', None)
+    job_id = request.args.get('job')
 
     if request.method == "POST":
-        input_path = None
-        output_path = None
-        
         try:
             # Get form inputs
             file = request.files.get("file")
@@ -149,7 +311,7 @@ def index():
             
             # Check if file is uploaded
             if not file or not file.filename:
-                raise ValueError("❌ Please upload a CSV file")
+                raise ValueError("❌ Please upload a CSV or Excel (.xlsx) file")
             
             # Check if all fields are filled
             if not weights_raw:
@@ -164,25 +326,10 @@ def index():
                 raise ValueError("❌ Invalid email format. Please enter a valid email address (e.g., user@example.com)")
             
             # Check file extension
-            if not file.filename.lower().endswith('.csv'):
-                raise ValueError("❌ Only CSV files are allowed. Please upload a file with .csv extension")
-
-            # Save uploaded file with unique name
-            timestamp = str(int(time.time()))
-            input_filename = f"input_{timestamp}.csv"
-            output_filename = f"result_{timestamp}.csv"
-            
-            input_path = os.path.join(UPLOAD_FOLDER, input_filename)
-            output_path = os.path.join(RESULT_FOLDER, output_filename)
-            file.save(input_path)
-
-            # ===== VALIDATION PHASE 2: CSV Structure Validation =====
-            
-            is_valid, csv_error, criteria_count = validate_csv_structure(input_path)
-            if not is_valid:
-                raise ValueError(csv_error)
+            if not file.filename.lower().endswith(('.csv', '.xlsx')):
+                raise ValueError("❌ Only CSV or Excel files are allowed. Please upload a file with .csv or .xlsx extension")
 
-            # ===== VALIDATION PHASE 3: Weights and Impacts Validation =====
+            # ===== VALIDATION PHASE 2: Weights and Impacts Validation =====
             
             # Parse weights
             try:
@@ -206,7 +353,7 @@ def index():
             if invalid_impacts:
                 raise ValueError(f"❌ Invalid impacts: {', '.join(invalid_impacts)}. Impacts must be '+' (benefit) or '-' (cost) separated by commas")
             
-            # ===== VALIDATION PHASE 4: Count Matching =====
+            # ===== VALIDATION PHASE 3: Count Matching =====
             
             # Check if counts match
             if len(weights) != len(impacts):
@@ -214,84 +361,37 @@ def index():
                     f"❌ Count mismatch: You provided {len(weights)} weights and {len(impacts)} impacts. "
                     f"Number of weights must equal number of impacts."
                 )
-            
-            # Check if counts match with CSV criteria columns
-            if len(weights) != criteria_count:
-                raise ValueError(
-                    f"❌ Count mismatch: CSV file has {criteria_count} criteria columns, but you provided "
-                    f"{len(weights)} weights and {len(impacts)} impacts. All counts must match."
-                )
 
-            # ===== TOPSIS PROCESSING =====
-            
-            print(f"✅ All validations passed. Processing TOPSIS...")
-            print(f"   - Criteria columns: {criteria_count}")
-            print(f"   - Weights: {weights}")
-            print(f"   - Impacts: {impacts}")
-            
-            # Validate input and apply TOPSIS using your package
-            try:
-                dataframe, decision_matrix, validated_weights, validated_impacts = validate_input(
-                    input_path, weights, impacts
-                )
-            except ValueError as ve:
-                # Catch errors from your TOPSIS package
-                raise ValueError(f"❌ TOPSIS validation error: {str(ve)}")
-            except Exception as e:
-                raise ValueError(f"❌ Error validating input data: {str(e)}")
+            # ===== QUEUE THE ANALYSIS =====
 
-            # Apply TOPSIS
-            try:
-                result = apply_topsis(dataframe, decision_matrix, validated_weights, validated_impacts)
-            except Exception as e:
-                raise ValueError(f"❌ Error applying TOPSIS algorithm: {str(e)}")
+            # The upload is read once here; parsing, scoring and email all
+            # happen on the job queue so this request returns immediately
+            upload = file.read()
+            # Bind the analysed matrix to this browser session for /rescore
+            dataset_id = uuid.uuid4().hex
+            session['dataset'] = dataset_id
+            job_id = job_queue.submit(
+                lambda: publish_analysis(upload, weights, impacts, dataset_id),
+                lambda result: send_email(email, result['result_id']),
+            )
+            print(f"📥 Queued TOPSIS job {job_id} for {email}")
 
-            # Save result
-            result.to_csv(output_path, index=False)
-            print(f"✅ TOPSIS result saved to {output_path}")
+            if request.accept_mimetypes.best == 'application/json':
+                return jsonify(job_id=job_id, status_url=url_for('job_status', job_id=job_id)), 202
+            return redirect(url_for('index', job=job_id))
 
-            # ===== EMAIL SENDING =====
-            
-            print(f"📧 Sending email to {email}...")
-            email_sent = send_email(email, output_path)
-            
-            # Convert results to JSON for display (preserving column order)
-            # Convert to dict with 'records' orientation to maintain column order
-            results_json = result.to_dict('records')
-            
-            # Clean up files after processing
-            if os.path.exists(input_path):
-                os.remove(input_path)
-                print(f"🗑️  Cleaned up input file: {input_path}")
-            if os.path.exists(output_path):
-                os.remove(output_path)
-                print(f"🗑️  Cleaned up output file: {output_path}")
-            
-            if email_sent:
-                # Set success message and results in session
-                session['toast'] = True
-                session['error'] = None
-                session['results'] = results_json
-                print("✅ Process completed successfully!")
-                
-                # Redirect to prevent form resubmission
-                return redirect(url_for('index'))
-            else:
-                session['toast'] = True
-                session['error'] = (
-                    "❌ TOPSIS analysis completed, but failed to send email. "
-                    "Please check email configuration (SENDER_EMAIL and APP_PASSWORD environment variables)."
-                )
-                session['results'] = results_json
-                return redirect(url_for('index'))
+        except UploadRejected as rejected:
+            # Raised while the upload was still streaming in
+            session['error'] = rejected.description
+            session['toast'] = True
+            return redirect(url_for('index'))
+
+        except RequestEntityTooLarge:
+            session['error'] = upload_too_large_message()
+            session['toast'] = True
+            return redirect(url_for('index'))
 
         except ValueError as ve:
-            # Clean up files if they exist
-            if input_path and os.path.exists(input_path):
-                os.remove(input_path)
-            if output_path and os.path.exists(output_path):
-                os.remove(output_path)
-            
             session['error'] = str(ve)
             session['toast'] = True
             return redirect(url_for('index'))
@@ -302,12 +402,6 @@ def index():
             return redirect(url_for('index'))
             
         except Exception as e:
-            # Clean up files if they exist
-            if input_path and os.path.exists(input_path):
-                os.remove(input_path)
-            if output_path and os.path.exists(output_path):
-                os.remove(output_path)
-            
             # Generic error handler
             error_msg = str(e)
             if "No such file or directory" in error_msg:
@@ -320,12 +414,182 @@ def index():
             session['toast'] = True
             return redirect(url_for('index'))
 
-    return render_template("index.html", toast=toast, error=error, results=results)
+    return render_template("index.html", toast=toast, error=error, job_id=job_id)
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Status of a queued analysis; links to the stored result once scoring is done"""
+    job = job_queue.status(job_id)
+    if job is None:
+        return {"error": "Unknown or expired job"}, 404
+
+    result = job.pop('result')
+    if result is not None:
+        job['result_id'] = result['result_id']
+        job['rows'] = result['rows']
+        job['timings'] = result['timings']
+        job['results_url'] = url_for('result_page', result_id=result['result_id'])
+    return jsonify(job)
+
+def criteria_list(value):
+    """Weights or impacts given as a list or a comma-separated string"""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(',')]
+    return value if isinstance(value, list) else []
+
+@app.route("/rescore", methods=["POST"])
+def rescore():
+    """
+    Re-rank this session's last analysed dataset with new weights/impacts
+    JSON or form body: weights, impacts (lists or "1,2,1" / "+,-,+"), limit
+    Returns the best `limit` rows (ties kept) without re-uploading or re-normalizing
+    """
+    body = request.get_json(silent=True) or request.form
+    dataset = datasets.get(session.get('dataset')) if session.get('dataset') else None
+    if dataset is None:
+        return {"error": "No dataset in this session (or it expired); run an analysis first"}, 404
+
+    try:
+        limit = min(max(int(body.get('limit', 50)), 1), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return {"error": "limit must be an integer"}, 400
+
+    try:
+        rows, scores, ranks = dataset['prepared'].rank(
+            criteria_list(body.get('weights', '')), criteria_list(body.get('impacts', '')), top_k=limit
+        )
+    except TopsisInputError as e:
+        return {"error": e.errors[0]['message'], "errors": e.errors}, 400
+
+    labels = dataset['labels'][rows].tolist()
+    return {
+        "columns": [dataset['name'], "Topsis Score", "Rank"],
+        "criteria": dataset['criteria'],
+        "rows": [list(row) for row in zip(labels, scores.tolist(), ranks.tolist())],
+        "total": dataset['prepared'].shape[0],
+    }
+
+@app.route("/results/<result_id>")
+def result_page(result_id):
+    """One page of a stored result: ?page=1&size=50&sort=<column>&order=asc|desc"""
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        size = min(max(int(request.args.get('size', 50)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return {"error": "page and size must be integers"}, 400
+    sort = request.args.get('sort') or None
+    descending = request.args.get('order', 'asc') == 'desc'
+
+    try:
+        meta, rows = result_store.page(result_id, page, size, sort, descending)
+    except KeyError:
+        return {"error": "Unknown or expired result"}, 404
+    except ValueError:
+        return {"error": f"Unknown sort column: {sort}"}, 400
+
+    return jsonify(
+        result_id=result_id,
+        columns=meta['columns'],
+        rows=rows,
+        page=page,
+        size=size,
+        total=meta['rows'],
+        pages=-(-meta['rows'] // size),
+        sort=sort,
+        order='desc' if descending else 'asc',
+    )
+
+def gzip_chunks(chunks):
+    """Gzip a stream of text chunks on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+@app.route("/results/<result_id>/download")
+def download_result(result_id):
+    """
+    Full result as CSV, streamed chunk by chunk from the store
+    ?columns=id,score,rank keeps only those columns, ?compression=gzip gzips it
+    """
+    try:
+        meta = result_store.meta(result_id)
+    except KeyError:
+        return {"error": "Unknown or expired result"}, 404
+
+    columns = request.args.get('columns')
+    compression = request.args.get('compression')
+    if compression not in (None, 'gzip'):
+        return {"error": "compression must be gzip"}, 400
+    try:
+        columns = select_columns(meta['columns'], columns.split(',') if columns else None)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    chunks = result_store.iter_csv(result_id, columns=columns)
+    if compression == 'gzip':
+        return Response(
+            gzip_chunks(chunks),
+            mimetype='application/gzip',
+            headers={'Content-Disposition': 'attachment; filename=topsis_results.csv.gz'},
+        )
+    return Response(
+        chunks,
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=topsis_results.csv'},
+    )
+
+@app.route("/api/topsis", methods=["POST"])
+def api_topsis():
+    """
+    Programmatic bulk scoring: CSV, NDJSON or JSON in, streamed CSV or NDJSON out
+    Weights and impacts come from the JSON body or ?weights=1,1,1&impacts=%2B,-,%2B
+    (a bare + in a query string decodes to a space, so encode it as %2B)
+    """
+    output = request.args.get('format')
+    if output is None:
+        best = request.accept_mimetypes.best_match(list(api.OUTPUT_TYPES.values()), default='text/csv')
+        output = 'ndjson' if best == api.OUTPUT_TYPES['ndjson'] else 'csv'
+    if output not in api.OUTPUT_TYPES:
+        return {"error": "format must be csv or ndjson"}, 400
+
+    try:
+        matrices = api.parse_matrices(
+            request.get_data(), request.mimetype,
+            request.args.get('weights'), request.args.get('impacts'),
+        )
+        if not matrices:
+            raise api.ApiError([{'code': 'empty', 'message': 'Request body has no matrices'}])
+        validated = api.validate_matrices(matrices, sheet=request.args.get('sheet'))
+        for _, _, decision_matrix, _, _ in validated:
+            check_upload_limits(decision_matrix)
+    except api.ApiError as e:
+        return {"error": str(e), "errors": e.errors}, e.status
+    except RequestEntityTooLarge:
+        return {"error": upload_too_large_message()}, 413
+    except UploadTooLarge as e:
+        return {"error": str(e)}, 413
+
+    stream = api.stream_ndjson if output == 'ndjson' else api.stream_csv
+    return Response(recorded(stream(validated)), mimetype=api.OUTPUT_TYPES[output])
+
+def recorded(chunks):
+    """Scoring of a streamed body runs after the request; record its stages too"""
+    with record_stages(callback=observe_stage):
+        yield from chunks
 
 @app.route("/health")
 def health():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "TOPSIS Web Service"}, 200
+    return {"status": "healthy", "service": "TOPSIS Web Service", "cache": result_cache.stats(),
+            "mail": mailer.stats(), "datasets": datasets.stats()}, 200
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Request and pipeline stage histograms in Prometheus text format"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
 
 @app.route("/samples/<filename>")
 def download_sample(filename):
@@ -343,8 +607,6 @@ if __name__ == "__main__":
     print("=" * 60)
     print(f"Port: {port}")
     print(f"Debug: {debug_mode}")
-    print(f"Upload folder: {UPLOAD_FOLDER}")
-    print(f"Result folder: {RESULT_FOLDER}")
     print("=" * 60)
     
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
@@ -0,0 +1,136 @@
+"""
+Local background job queue for TOPSIS analyses
+
+Scoring runs on one thread pool and email delivery on another, so a slow
+SMTP server never holds up scoring, and neither holds up the request thread.
+Email is a separate stage that is retried with exponential backoff, or
+handed to a pooled Mailer (mailer.py) that retries on its own; failures
+that cannot go away, such as missing SMTP settings, are not retried.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class PermanentDeliveryError(Exception):
+    """Raised by a deliver callable when retrying cannot help (e.g. email is not configured)"""
+
+
+class JobQueue:
+    def __init__(self, workers=2, email_workers=2, email_attempts=3, email_backoff=2.0, ttl=3600):
+        self.email_attempts = email_attempts
+        self.email_backoff = email_backoff
+        self.ttl = ttl
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="topsis-job")
+        self._mailers = ThreadPoolExecutor(max_workers=email_workers, thread_name_prefix="topsis-mail")
+
+    def submit(self, analyse, deliver=None):
+        """
+        Queue a job and return its ID immediately
+        analyse() returns the job result; deliver(result) returns True once
+        the email went out and is retried while it returns False or raises,
+        or returns a Future (e.g. a mailer Delivery) that the job follows;
+        PermanentDeliveryError fails the email stage without retrying
+        """
+        self._prune()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "error": None,
+                "result": None,
+                "email": {"status": "pending" if deliver else "skipped", "attempts": 0, "error": None},
+                "created": time.time(),
+                "updated": time.time(),
+            }
+        self._workers.submit(self._run, job_id, analyse, deliver)
+        return job_id
+
+    def status(self, job_id):
+        """Snapshot of a job (None if unknown or expired)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {**job, "email": dict(job["email"])}
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields, updated=time.time())
+
+    def _update_email(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id]["email"].update(fields)
+            self._jobs[job_id]["updated"] = time.time()
+
+    def _run(self, job_id, analyse, deliver):
+        self._update(job_id, status="running")
+        try:
+            result = analyse()
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e))
+            if deliver:
+                self._update_email(job_id, status="skipped")
+            return
+
+        self._update(job_id, status="done", result=result)
+        if deliver:
+            self._mailers.submit(self._deliver, job_id, deliver, result)
+
+    def _deliver(self, job_id, deliver, result):
+        for attempt in range(1, self.email_attempts + 1):
+            self._update_email(job_id, status="sending", attempts=attempt)
+            try:
+                outcome = deliver(result)
+                if isinstance(outcome, Future):
+                    self._follow(job_id, outcome)
+                    return
+                if outcome:
+                    self._update_email(job_id, status="sent", error=None)
+                    return
+                error = "Email delivery failed"
+            except PermanentDeliveryError as e:
+                self._update_email(job_id, status="failed", error=str(e))
+                return
+            except Exception as e:
+                error = str(e)
+
+            if attempt < self.email_attempts:
+                self._update_email(job_id, status="retrying", error=error)
+                time.sleep(self.email_backoff * 2 ** (attempt - 1))
+
+        self._update_email(job_id, status="failed", error=error)
+
+    def _follow(self, job_id, delivery):
+        """Mirror an asynchronous delivery (and its retries) in the job's email status"""
+        def attempt_started(attempt, error):
+            if error is None:
+                self._update_email(job_id, status="sending", attempts=attempt)
+            else:
+                self._update_email(job_id, status="retrying", attempts=attempt, error=error)
+
+        def finished(done):
+            if done.exception() is None:
+                self._update_email(job_id, status="sent", error=None)
+            else:
+                self._update_email(job_id, status="failed", error=str(done.exception()))
+
+        if hasattr(delivery, "add_attempt_callback"):
+            delivery.add_attempt_callback(attempt_started)
+        delivery.add_done_callback(finished)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["status"] in ("done", "failed") and job["updated"] < cutoff
+                and job["email"]["status"] not in ("pending", "sending", "retrying")
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,171 @@
+"""
+Pooled SMTP delivery for result emails
+
+A Mailer keeps a few SMTP connections open (one per sender thread) and
+sends every queued message over them back to back, so a burst of results
+costs one TLS handshake and login per connection instead of one per email.
+Idle connections are closed after a while and reopened on demand; a
+connection is also recycled after a number of messages, since providers
+cap messages per session. Transient failures (dropped connections, 4xx
+replies) are retried with exponential backoff; permanent ones (5xx,
+refused recipients, bad credentials) fail the delivery straight away.
+"""
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import Future
+
+
+class Delivery(Future):
+    """
+    Future of one queued email: resolves to True once sent
+    add_attempt_callback(fn) is called with (attempt, error) as each attempt
+    starts; error is the previous attempt's failure, None for the first
+    """
+
+    def __init__(self, message):
+        super().__init__()
+        self.message = message
+        self.attempts = 0
+        self.last_error = None
+        self._attempt_callbacks = []
+
+    def add_attempt_callback(self, fn):
+        self._attempt_callbacks.append(fn)
+
+    def _start_attempt(self, attempt, error):
+        self.attempts = attempt
+        for fn in list(self._attempt_callbacks):
+            fn(attempt, None if error is None else str(error))
+
+
+def is_permanent(error):
+    """Whether retrying cannot help (5xx replies, refused recipients, bad login)"""
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPNotSupportedError)):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class Mailer:
+    def __init__(self, host, port, use_ssl=True, username=None, password=None, connections=2,
+                 max_per_connection=100, idle_timeout=30.0, attempts=3, backoff=2.0, timeout=30.0):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.username = username
+        self.password = password
+        self.max_per_connection = max_per_connection
+        self.idle_timeout = idle_timeout
+        self.attempts = attempts
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {"sent": 0, "failed": 0, "retries": 0, "connections": 0}
+        self._threads = [
+            threading.Thread(target=self._work, name=f"topsis-smtp-{i}", daemon=True)
+            for i in range(connections)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def send(self, message):
+        """Queue an EmailMessage and return its Delivery immediately"""
+        delivery = Delivery(message)
+        self._queue.put(delivery)
+        return delivery
+
+    def stats(self):
+        """Counters: sent, failed, retries, connections opened, queued"""
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+    def close(self, timeout=None):
+        """Send what is queued, then close every connection"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _connect(self):
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._count("connections")
+        return smtp
+
+    @staticmethod
+    def _disconnect(smtp):
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (OSError, smtplib.SMTPException):
+            smtp.close()
+
+    def _work(self):
+        # One connection per thread, kept open between messages
+        smtp, sent_on_connection = None, 0
+        while True:
+            try:
+                delivery = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self._disconnect(smtp)
+                smtp, sent_on_connection = None, 0
+                continue
+            if delivery is None:
+                self._disconnect(smtp)
+                return
+
+            if sent_on_connection >= self.max_per_connection:
+                self._disconnect(smtp)
+                smtp, sent_on_connection = None, 0
+            smtp, sent_on_connection = self._deliver(delivery, smtp, sent_on_connection)
+
+    def _deliver(self, delivery, smtp, sent_on_connection):
+        error = None
+        attempt = 0
+        while attempt < self.attempts:
+            attempt += 1
+            delivery._start_attempt(attempt, error)
+            reused = smtp is not None
+            try:
+                if smtp is None:
+                    smtp, sent_on_connection = self._connect(), 0
+                smtp.send_message(delivery.message)
+            except (OSError, smtplib.SMTPException) as e:
+                error = e
+                delivery.last_error = str(e)
+                if not isinstance(e, smtplib.SMTPRecipientsRefused):
+                    self._disconnect(smtp)
+                    smtp = None
+                if is_permanent(e):
+                    break
+                if reused and isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError)):
+                    # The server dropped a kept-alive connection; that is not
+                    # this message's fault, so reconnect without a backoff
+                    attempt -= 1
+                    continue
+                if attempt < self.attempts:
+                    self._count("retries")
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                continue
+
+            self._count("sent")
+            delivery.set_result(True)
+            return smtp, sent_on_connection + 1
+
+        self._count("failed")
+        delivery.set_exception(error)
+        return smtp, sent_on_connection
@@ -0,0 +1,132 @@
+"""
+Server-side store for TOPSIS results
+
+Each result is kept under its own ID as one .npy file per column (strings as
+fixed-width unicode) plus a small meta.json, so pages are read through memory
+maps and cost O(page size), however many rows the result has. The sort order
+of a column is computed once, on first use, and cached next to the columns.
+"""
+import csv
+import io
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+
+class ResultStore:
+    def __init__(self, root="/tmp/topsis-results", ttl=3600):
+        self.root = root
+        self.ttl = ttl
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, result_id, name=""):
+        if not result_id.isalnum():
+            raise KeyError(result_id)
+        return os.path.join(self.root, result_id, name)
+
+    def save(self, dataframe):
+        """Store a result frame and return its ID"""
+        self._prune()
+        result_id = uuid.uuid4().hex
+        directory = self._path(result_id)
+        os.makedirs(directory)
+
+        for i, column in enumerate(dataframe.columns):
+            values = dataframe[column]
+            if values.dtype.kind in "biuf":
+                array = values.to_numpy()
+            else:
+                array = values.astype(str).to_numpy(dtype=str)
+            np.save(os.path.join(directory, f"col_{i}.npy"), array)
+
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"columns": [str(column) for column in dataframe.columns],
+                       "rows": len(dataframe), "created": time.time()}, f)
+        return result_id
+
+    def meta(self, result_id):
+        try:
+            with open(self._path(result_id, "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise KeyError(result_id)
+
+    def _column(self, result_id, index):
+        return np.load(self._path(result_id, f"col_{index}.npy"), mmap_mode="r")
+
+    def _order(self, result_id, index):
+        path = self._path(result_id, f"order_{index}.npy")
+        try:
+            return np.load(path, mmap_mode="r")
+        except OSError:
+            order = np.argsort(self._column(result_id, index), kind="stable")
+            temporary = f"{path}.{uuid.uuid4().hex}.npy"
+            np.save(temporary, order)
+            os.replace(temporary, path)
+            return np.load(path, mmap_mode="r")
+
+    @staticmethod
+    def _json_values(values):
+        if values.dtype.kind == "f":
+            return [None if np.isnan(value) else value for value in values.tolist()]
+        return values.tolist()
+
+    def page(self, result_id, page=1, size=50, sort=None, descending=False):
+        """
+        One page of rows, optionally sorted by a column
+        Returns (meta, rows) where rows are lists in column order
+        """
+        meta = self.meta(result_id)
+        total = meta["rows"]
+        start = (page - 1) * size
+        stop = min(start + size, total)
+        if start >= total:
+            return meta, []
+
+        if sort is None:
+            rows = np.arange(start, stop)
+        else:
+            order = self._order(result_id, meta["columns"].index(sort))
+            if descending:
+                rows = np.asarray(order[total - stop:total - start])[::-1]
+            else:
+                rows = np.asarray(order[start:stop])
+
+        columns = [
+            self._json_values(self._column(result_id, i)[rows])
+            for i in range(len(meta["columns"]))
+        ]
+        return meta, [list(row) for row in zip(*columns)]
+
+    def iter_csv(self, result_id, chunk_rows=10000, columns=None):
+        """Yield the whole result (or only the named columns) as CSV text, chunk by chunk"""
+        meta = self.meta(result_id)
+        names = meta["columns"] if columns is None else list(columns)
+        columns = [self._column(result_id, meta["columns"].index(name)) for name in names]
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for start in range(0, meta["rows"], chunk_rows):
+            # NaN (an unranked score) becomes None, which csv writes as an empty cell
+            block = [self._json_values(column[start:start + chunk_rows]) for column in columns]
+            writer.writerows(zip(*block))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
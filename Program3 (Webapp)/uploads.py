@@ -0,0 +1,147 @@
+"""
+Upload validation while the request body is still streaming in
+
+Flask hands every uploaded file part to Request._get_file_stream. The
+guarded request returns an UploadGuard there, which spools the bytes to an
+anonymous temporary file (tempfile names never collide) and checks them as
+they arrive: the header and the first rows of a CSV are validated as soon as
+the first chunk is in, and the row count is tracked chunk by chunk. Any
+failure raises UploadRejected mid-upload, so the rest of the body is never
+stored or parsed.
+"""
+import csv
+import io
+import tempfile
+
+from flask import Request, current_app
+from werkzeug.exceptions import BadRequest
+
+# Bytes of a CSV upload checked before the rest is accepted
+PROBE_BYTES = 64 * 1024
+# Uploads above this size are spooled to disk instead of memory
+SPOOL_BYTES = 1024 * 1024
+
+# Cells pandas reads as missing values rather than text
+NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+
+class UploadRejected(BadRequest):
+    """The upload failed an early check; description is the user-facing message"""
+
+
+class UploadTooLarge(ValueError):
+    """The parsed input has more rows or columns than allowed; str() is the user-facing message"""
+
+
+def _is_number(cell):
+    try:
+        float(cell)
+    except ValueError:
+        return False
+    return "_" not in cell
+
+
+def check_csv_head(head, complete, max_columns):
+    """
+    Validate the header and the rows fully contained in the first bytes
+    of a CSV upload; complete says whether head is the whole file
+    """
+    text = head.decode("utf-8-sig", errors="replace")
+    if not complete:
+        # Drop the last, possibly cut-off line
+        text = text[:text.rfind("\n") + 1]
+
+    rows = [row for row in csv.reader(io.StringIO(text)) if row]
+    if not rows:
+        if complete:
+            raise UploadRejected("❌ CSV file is empty. Please provide data rows.")
+        raise UploadRejected("❌ The first line of the CSV file is too long to be a header row.")
+
+    header = rows[0]
+    if len(header) < 3:
+        raise UploadRejected(
+            f"❌ CSV file must contain at least 3 columns (1 name + 2 criteria). Found {len(header)} columns."
+        )
+    if len(header) > max_columns:
+        raise UploadRejected(f"❌ Too many columns: {len(header)} (the limit is {max_columns}).")
+    if complete and len(rows) == 1:
+        raise UploadRejected("❌ CSV file is empty. Please provide data rows.")
+
+    for row in rows[1:]:
+        if len(row) > len(header):
+            raise UploadRejected(
+                f"❌ A row has {len(row)} values but the header has {len(header)} columns."
+            )
+        # Short rows are padded with missing values by pandas
+        cells = row[1:] + [""] * (len(header) - max(len(row), 1))
+        for column, cell in zip(header[1:], cells):
+            if cell.strip() in NA_VALUES:
+                raise UploadRejected(
+                    f"❌ Column '{column}' has empty cells. "
+                    "Every alternative needs a value for every criterion."
+                )
+            if not _is_number(cell):
+                raise UploadRejected(
+                    f"❌ Column '{column}' contains non-numeric values. "
+                    "All criteria columns must have numeric values only."
+                )
+
+
+class UploadGuard:
+    """Writable spool for one uploaded file that validates what is written"""
+
+    def __init__(self, filename, max_rows, max_columns):
+        self.is_csv = (filename or "").lower().endswith(".csv")
+        self.max_rows = max_rows
+        self.max_columns = max_columns
+        self.head = bytearray()
+        self.checked = not self.is_csv
+        self.lines = 0
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+
+    def write(self, data):
+        if self.is_csv:
+            if not self.checked:
+                self.head += data[:PROBE_BYTES - len(self.head)]
+                if len(self.head) >= PROBE_BYTES:
+                    self._check_head(complete=False)
+
+            self.lines += data.count(b"\n")
+            # The header line is not a row; allow a final line without "\n"
+            if self.lines - 1 > self.max_rows:
+                raise UploadRejected(f"❌ Too many rows: the limit is {self.max_rows}.")
+        return self.file.write(data)
+
+    def _check_head(self, complete):
+        self.checked = True
+        check_csv_head(bytes(self.head), complete, self.max_columns)
+        self.head = None
+
+    def seek(self, offset, whence=0):
+        # The form parser rewinds the spool once the file part is complete
+        if not self.checked:
+            self._check_head(complete=True)
+        return self.file.seek(offset, whence)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def __iter__(self):
+        return iter(self.file)
+
+
+class GuardedRequest(Request):
+    """
+    Request whose file uploads go through an UploadGuard
+    Limits come from the MAX_UPLOAD_ROWS and MAX_UPLOAD_COLUMNS app config
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadGuard(
+            filename,
+            current_app.config["MAX_UPLOAD_ROWS"],
+            current_app.config["MAX_UPLOAD_COLUMNS"],
+        )